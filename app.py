@@ -13,6 +13,21 @@ import plotly.graph_objects as go
 from datetime import datetime
 import yaml
 import sys
+import time
+import logging
+
+from clinical_scores import compute_clinical_scores, CARRY_FORWARD_HOURS, NEWS2_BAND_NAMES, NEWS2_BAND_UNKNOWN
+from treatment_rules import TreatmentRuleEngine
+from result_cache import ResultCache, file_hash
+from inference_service import InferenceClient
+from micro_batching import BatchedModel
+from cohort_scoring import feature_columns
+from live_updates import LIVE_FIELDS, live_snapshot, snapshot_delta, format_live_value
+from drift_monitor import DriftMonitor, VITAL_COLS, build_reference_profile, load_reference_profile
+from unit_aggregates import UnitAggregateStore
+from what_if import ALERT_VITALS, SCENARIO_PRESETS, run_what_if
+from time_series_store import open_store, read_versioned
+from cache_budget import CacheBudget
 
 # ============================================================
 # SETUP PATHS
@@ -27,13 +42,16 @@ st.set_page_config(
 APP_PATH = Path(__file__).resolve()
 PROJECT_FOLDER = APP_PATH.parent.parent.parent
 ICU_ROOT = PROJECT_FOLDER.parent
+MODEL_PATH = PROJECT_FOLDER / 'models' / 'xgboost_sepsis.pkl'
+REFERENCE_PROFILE_PATH = PROJECT_FOLDER / 'models' / 'reference_profile.json'
+DATA_PATH = PROJECT_FOLDER / 'data' / 'processed' / 'sepsis_features_final.parquet'
 sys.path.insert(0, str(PROJECT_FOLDER))
+logger = logging.getLogger(__name__)
 
 # Import advanced modules
 try:
     from src.explainer.shap_explainer import SepsisExplainer
     from src.alerts.alert_engine import AlertEngine
-    from src.recommendations.treatment_engine import TreatmentEngine
     has_advanced_features = True
 except:
     has_advanced_features = False
@@ -47,31 +65,143 @@ def load_config():
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
+@st.cache_resource
+def load_inference_client():
+    """Client for the shared inference service, if one is configured and running"""
+    socket_path = config.get('inference', {}).get('socket')
+    if not socket_path or not Path(socket_path).exists():
+        return None
+    try:
+        client = InferenceClient(socket_path)
+        client.ping()
+        return client
+    except:
+        return None
+
 @st.cache_resource
 def load_model():
-    return joblib.load(PROJECT_FOLDER / 'models' / 'xgboost_sepsis.pkl')
+    client = load_inference_client()
+    if client is not None:
+        return client
+    
+    # Concurrent sessions share one batcher in front of the local model
+    model = joblib.load(MODEL_PATH)
+    batching = config.get('batching', {})
+    if not batching.get('enabled', True):
+        return model
+    return BatchedModel(
+        model,
+        max_wait_ms=batching.get('max_wait_ms', 1.0),
+        max_batch_size=batching.get('max_batch_size', 128)
+    )
+
+@st.cache_resource
+def load_model_hash():
+    """Hash of the model that actually scores: the service's when remote"""
+    client = load_inference_client()
+    if client is not None:
+        return client.model_hash()
+    return file_hash(MODEL_PATH)
+
+@st.cache_resource
+def load_result_cache(model_hash):
+    """Persistent results; entries of other model versions are purged when the model changes"""
+    cache_cfg = config.get('cache', {})
+    cache_path = cache_cfg.get('path', PROJECT_FOLDER / 'cache' / 'results.sqlite')
+    cache = ResultCache(cache_path, max_bytes=cache_cfg.get('max_mb', 256) * 1024 * 1024)
+    cache.purge_model(model_hash)
+    return cache
+
+@st.cache_resource
+def load_cache_budget():
+    """Process-wide ceiling on in-memory caches (dataset, predictions, explanations, figures)"""
+    return CacheBudget(config.get('cache', {}).get('memory_mb', 1024) * 1024 * 1024)
 
 @st.cache_resource
 def load_explainer_model():
     if not has_advanced_features:
         return None
+    if load_inference_client() is not None:
+        return load_inference_client()
     try:
-        explainer = SepsisExplainer(model_path=str(PROJECT_FOLDER / 'models' / 'xgboost_sepsis.pkl'))
+        explainer = SepsisExplainer(model_path=str(MODEL_PATH))
         explainer.load_explainer()
         return explainer
     except:
         return None
 
-@st.cache_data
+@st.cache_resource
+def load_treatment_engine():
+    return TreatmentRuleEngine()
+
+@st.cache_resource
+def load_store():
+    """Patient-hour storage; the legacy single parquet file unless configured otherwise"""
+    storage = config.get('storage', {})
+    return open_store(storage.get('backend', 'parquet'), storage.get('path', DATA_PATH), read_only=True)
+
+def data_version():
+    """Changes whenever new hours are written to the dataset"""
+    return load_store().version()
+
+class DatasetMoved(Exception):
+    """The store gained hours between checking its version and reading it"""
+
 def load_data():
-    return pd.read_parquet(PROJECT_FOLDER / 'data' / 'processed' / 'sepsis_features_final.parquet')
+    """(version, dataset) of the current data; the shared read-only frame is pinned in
+    the budget under the version it was actually read at, and earlier versions are
+    dropped when a new one loads"""
+    budget = load_cache_budget()
+    while True:
+        version = data_version()
+        
+        def read():
+            read_version, frame = read_versioned(load_store())
+            if read_version != version:
+                raise DatasetMoved
+            budget.discard('data', lambda key: key[1] != version)
+            return frame
+        
+        try:
+            return version, budget.get_or_compute('data', ('dataset', version), read, pin=True)
+        except DatasetMoved:
+            continue
+
+def load_clinical_scores(version, frame):
+    """Scores of the frame loaded at ``version``; only the current version's are pinned"""
+    return load_cache_budget().get_or_compute(
+        'data', ('clinical_scores', version), lambda: compute_clinical_scores(frame),
+        pin=version == data_version()
+    )
+
+@st.cache_resource
+def load_unit_store():
+    store_path = config.get('unit_aggregates', {}).get('path', PROJECT_FOLDER / 'cache' / 'unit_aggregates.sqlite')
+    return UnitAggregateStore(store_path)
+
+@st.cache_resource
+def load_drift_monitor():
+    """One monitor per server process, profiled against the training parquet"""
+    if REFERENCE_PROFILE_PATH.exists():
+        reference = load_reference_profile(REFERENCE_PROFILE_PATH)
+    else:
+        reference = build_reference_profile(load_data()[1])
+    return DriftMonitor(reference)
 
 # Load everything
 try:
     config = load_config()
     model = load_model()
+    model_hash = load_model_hash()
+    result_cache = load_result_cache(model_hash)
     explainer = load_explainer_model()
-    df = load_data()
+    cache_budget = load_cache_budget()
+    # One version per run, so the frame and its scores always share an index
+    dataset_version, df = load_data()
+    clinical_scores = load_clinical_scores(dataset_version, df)
+    treatment_engine = load_treatment_engine()
+    drift_monitor = load_drift_monitor()
+    unit_store = load_unit_store()
 except Exception as e:
     st.error(f"❌ Error loading: {e}")
     st.stop()
@@ -81,14 +211,11 @@ if has_advanced_features:
     try:
         config_path_str = str(ICU_ROOT / 'config' / 'config.yaml')
         alert_engine = AlertEngine(config_path_str)
-        treatment_engine = TreatmentEngine()
     except:
         alert_engine = None
-        treatment_engine = None
         has_advanced_features = False
 else:
     alert_engine = None
-    treatment_engine = None
 
 # ============================================================
 # ULTRA-MODERN STYLING
@@ -433,6 +560,9 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Filled by the live monitor loop at the end of the page
+live_panel = st.container()
+
 # ============================================================
 # SIDEBAR WITH TEST MODE
 # ============================================================
@@ -452,6 +582,19 @@ with st.sidebar:
     else:
         st.warning("🤖 AI: Basic Mode")
     
+    # ============================================================
+    # 🔴 LIVE MODE
+    # ============================================================
+    st.markdown("---")
+    st.markdown("## 🔴 LIVE MODE")
+    live_mode = st.toggle(
+        "Follow latest hour",
+        value=False,
+        help="Push only changed values when new hours arrive for this patient"
+    )
+    if live_mode:
+        live_refresh_s = st.slider("Check for new data every (s)", 1, 30, 5)
+    
     # ============================================================
     # 🧪 TEST MODE
     # ============================================================
@@ -496,15 +639,37 @@ with st.sidebar:
 # ============================================================
 # GET PATIENT DATA WITH REALISTIC VALUES
 # ============================================================
-exclude_cols = ['SepsisLabel', 'Patient_ID', 'Hour', 'ICULOS', 'Unnamed: 0']
-feature_cols = [col for col in df.columns if col not in exclude_cols]
+feature_cols = feature_columns(df)
+
+def predict_risk_trend(patient_id, rows):
+    """Risk % for each hour in rows, one batched call, persisted per model version"""
+    last_hour = len(rows) - 1
+    
+    def compute():
+        trend = result_cache.get('trend', patient_id, last_hour, model_hash)
+        if trend is not None:
+            return trend
+        X_rows = rows[feature_cols].fillna(0).values
+        trend = (model.predict_proba(X_rows)[:, 1] * 100).tolist()
+        result_cache.put('trend', patient_id, last_hour, model_hash, trend)
+        return trend
+    
+    return cache_budget.get_or_compute('predictions', (patient_id, last_hour, model_hash), compute)
 
 current_obs = patient_data.iloc[selected_hour]
 X = current_obs[feature_cols].fillna(0).values.reshape(1, -1)
 
-# Predict risk
-risk_proba = model.predict_proba(X)[0][1]
-risk_percent = risk_proba * 100
+# Predict risk (the trend covers every selectable hour)
+risk_trend = predict_risk_trend(selected_patient, patient_data.iloc[:max_hour + 1])
+risk_proba = risk_trend[selected_hour] / 100
+risk_percent = risk_trend[selected_hour]
+
+# Every scored row feeds the data-quality / drift sketches
+drift_monitor.observe(current_obs, selected_patient, current_obs['Hour'])
+estimated_vitals = [
+    col for col in VITAL_COLS
+    if pd.isna(current_obs.get(col)) or not 0 < current_obs.get(col) < 1000
+]
 
 # 🧪 TEST MODE OVERRIDE
 if test_mode:
@@ -520,6 +685,30 @@ if test_mode:
     </div>
     """, unsafe_allow_html=True)
 
+# Data quality summary for the whole server process
+with st.sidebar.expander("🩺 DATA QUALITY & DRIFT"):
+    st.markdown(f"**Rows monitored:** {drift_monitor.rows}")
+    quality = drift_monitor.report()
+    drifted = quality.loc[quality['drift'], 'feature'].tolist()
+    if drifted:
+        st.warning(f"⚠️ Drift detected: {', '.join(drifted)}")
+    else:
+        st.success("✅ No drift detected")
+    st.dataframe(
+        quality.loc[quality['feature'].isin(VITAL_COLS), ['feature', 'missing_rate', 'out_of_range', 'psi']],
+        hide_index=True
+    )
+
+with st.sidebar.expander("🧮 CACHE & MEMORY"):
+    st.markdown(f"**In use:** {cache_budget.total_bytes / 2**20:.0f} / {cache_budget.max_bytes / 2**20:.0f} MB")
+    if cache_budget.over_budget:
+        st.warning(f"⚠️ The dataset alone takes {cache_budget.pinned_bytes / 2**20:.0f} MB - "
+                   "raise cache.memory_mb; nothing else can be cached")
+    st.dataframe(
+        cache_budget.stats()[['namespace', 'entries', 'mb', 'hits', 'misses', 'evictions']].round(1),
+        hide_index=True
+    )
+
 # Get vitals with realistic fallback values
 def get_realistic_vital(obs_value, col_name, risk_level):
     """Get vital sign with realistic values based on risk"""
@@ -605,6 +794,33 @@ else:
     </div>
     """, unsafe_allow_html=True)
 
+# Early-warning scores shown next to the model risk
+current_scores = clinical_scores.loc[current_obs.name]
+news2_band = NEWS2_BAND_NAMES[int(current_scores['NEWS2_band'])]
+
+s1, s2, s3 = st.columns(3)
+with s1:
+    st.markdown(f"""
+    <div class='feature-box'>
+        <h4>🩺 SIRS: {int(current_scores['SIRS'])}/4</h4>
+        <p style='margin: 0; color: #666;'>{'⚠️ SIRS criteria met (≥2)' if current_scores['SIRS'] >= 2 else '✅ Below SIRS threshold'}</p>
+    </div>
+    """, unsafe_allow_html=True)
+with s2:
+    st.markdown(f"""
+    <div class='feature-box'>
+        <h4>🧭 qSOFA: {int(current_scores['qSOFA'])}/2</h4>
+        <p style='margin: 0; color: #666;'>{'⚠️ qSOFA positive' if current_scores['qSOFA'] >= 2 else '✅ qSOFA negative'} (mentation not recorded)</p>
+    </div>
+    """, unsafe_allow_html=True)
+with s3:
+    st.markdown(f"""
+    <div class='feature-box'>
+        <h4>📟 NEWS2: {'–' if current_scores['NEWS2_band'] == NEWS2_BAND_UNKNOWN else int(current_scores['NEWS2'])}</h4>
+        <p style='margin: 0; color: #666;'>Clinical risk: {news2_band}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
 # ============================================================
 # VITALS + ALERT SYSTEM
 # ============================================================
@@ -612,6 +828,8 @@ col_left, col_right = st.columns([2, 1])
 
 with col_left:
     st.markdown("<div class='section-title'>💓 VITAL SIGNS MONITOR</div>", unsafe_allow_html=True)
+    if estimated_vitals:
+        st.caption(f"ℹ️ Not recorded this hour, estimated from risk level: {', '.join(estimated_vitals)}")
     
     v1, v2, v3 = st.columns(3)
     
@@ -745,48 +963,22 @@ with col_right:
 # ============================================================
 st.markdown("<div class='section-title'>💊 TREATMENT RECOMMENDATIONS</div>", unsafe_allow_html=True)
 
-# Generate recommendations based on risk level
-if risk_percent < 20:
+# Look up protocol steps for this patient's risk band, vitals and scores.
+# Rules only see recorded values: estimated display vitals stay unflagged (NaN)
+recorded_vitals = {
+    key: float(current_obs[col]) if col in current_obs and 0 < current_obs[col] < 1000 else np.nan
+    for key, col in ALERT_VITALS.items()
+}
+plan = treatment_engine.recommend(risk_percent, recorded_vitals, current_scores)
+recommendations = plan['actions']
+rationale = plan['rationale']
+
+if plan['band'] == 'LOW':
     st.success("### ✅ LOW RISK - ROUTINE CARE")
-    recommendations = [
-        "Continue standard monitoring every 4 hours",
-        "Maintain current treatment plan",
-        "Record vital signs regularly",
-        "Patient can have normal activities as tolerated",
-        "No immediate intervention required",
-        "Continue prescribed medications as ordered"
-    ]
-    rationale = "All vitals within normal range. Patient is stable and showing no signs of deterioration."
-    
-elif risk_percent < 60:
+elif plan['band'] == 'MEDIUM':
     st.warning("### ⚠️ MEDIUM RISK - ENHANCED MONITORING")
-    recommendations = [
-        "🔄 Increase monitoring frequency to every 1-2 hours",
-        "📊 Check lab values: lactate, WBC count, creatinine",
-        "💉 Ensure IV access is functional and patent",
-        "📞 Alert attending physician of patient status",
-        "💊 Consider starting/adjusting antibiotics if infection suspected",
-        "💧 Monitor fluid balance and urine output closely",
-        "⏰ Reassess patient condition in 1 hour",
-        "📋 Document all changes in patient status"
-    ]
-    rationale = "Patient showing early signs of clinical deterioration. Closer observation and possible intervention needed to prevent worsening."
-    
 else:
     st.error("### 🚨 CRITICAL - IMMEDIATE ACTION REQUIRED")
-    recommendations = [
-        "🚨 **IMMEDIATE physician notification required**",
-        "📡 Initiate continuous vital signs monitoring",
-        "🩺 Obtain STAT labs: blood cultures, lactate, CBC, metabolic panel",
-        "💉 Ensure adequate IV access (consider central line placement)",
-        "💧 Begin aggressive fluid resuscitation (30mL/kg crystalloid)",
-        "💊 **Start broad-spectrum antibiotics within 1 hour**",
-        "🏥 Consider ICU transfer or escalation of care level",
-        "🫁 Provide oxygen support as needed (target SpO2 > 92%)",
-        "📞 Notify rapid response team immediately",
-        "⚡ Prepare for possible intubation if respiratory distress"
-    ]
-    rationale = "**CRITICAL**: Patient at high risk of sepsis or severe deterioration. Immediate intervention required per sepsis protocol."
 
 # Display recommendations in beautiful format
 st.markdown("<div class='rec-box'>", unsafe_allow_html=True)
@@ -821,7 +1013,20 @@ if has_advanced_features and explainer and config.get('explainer', {}).get('enab
     
     with st.spinner("🔍 Analyzing with AI..."):
         try:
-            explanation = explainer.explain_patient(X, feature_cols)
+            def explain():
+                explanation = result_cache.get('shap', selected_patient, selected_hour, model_hash)
+                if explanation is None:
+                    explanation = explainer.explain_patient(X, feature_cols)
+                    try:
+                        result_cache.put('shap', selected_patient, selected_hour, model_hash, explanation)
+                    except TypeError as e:
+                        logger.warning("SHAP explanation for patient %s hour %s not persisted: %s",
+                                       selected_patient, selected_hour, e)
+                return explanation
+            
+            explanation = cache_budget.get_or_compute(
+                'explanations', (selected_patient, selected_hour, model_hash), explain
+            )
             
             col1, col2 = st.columns(2)
             
@@ -862,54 +1067,68 @@ if has_advanced_features and explainer and config.get('explainer', {}).get('enab
 st.markdown("<div class='section-title'>📈 RISK TREND OVER TIME</div>", unsafe_allow_html=True)
 
 if len(patient_data) > 1:
-    hours = []
-    risks = []
+    hours = list(range(len(risk_trend)))
+    risks = list(risk_trend)
     
-    for idx in range(min(len(patient_data), 9)):
-        obs = patient_data.iloc[idx]
-        X_temp = obs[feature_cols].fillna(0).values.reshape(1, -1)
+    def build_trend_figure():
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=hours, y=risks,
+            mode='lines+markers',
+            line=dict(color='rgb(102, 126, 234)', width=4),
+            marker=dict(size=12, color=risks, colorscale='RdYlGn_r', showscale=True,
+                        colorbar=dict(title="Risk %", thickness=15, x=1.08)),
+            hovertemplate='<b>Hour %{x}</b><br>Risk: %{y:.1f}%<extra></extra>'
+        ))
+        
+        trend_scores = clinical_scores.loc[patient_data.index[:len(hours)]]
+        fig.add_trace(go.Scatter(
+            x=hours, y=trend_scores['NEWS2'].tolist(),
+            mode='lines+markers', name='NEWS2', yaxis='y2',
+            line=dict(color='rgb(26, 26, 46)', width=2, dash='dot'),
+            marker=dict(size=7, symbol='diamond'),
+            hovertemplate='<b>Hour %{x}</b><br>NEWS2: %{y}<extra></extra>'
+        ))
         
-        # In test mode, use simulated trend
+        # In test mode, mark the overridden risk next to the real model trend
         if test_mode:
-            # Create a realistic trend around the test risk
-            variation = np.random.uniform(-10, 10)
-            risk = min(100, max(0, risk_percent + variation))
-        else:
-            risk = model.predict_proba(X_temp)[0][1] * 100
+            fig.add_trace(go.Scatter(
+                x=[selected_hour], y=[risk_percent],
+                mode='markers', name='Test override',
+                marker=dict(size=18, symbol='star', color='#ff9100', line=dict(color='black', width=1)),
+                hovertemplate='<b>Test override</b><br>Risk: %{y:.1f}%<extra></extra>'
+            ))
+        
+        fig.add_hrect(y0=0, y1=20, fillcolor="green", opacity=0.1, line_width=0, 
+                      annotation_text="SAFE ZONE", annotation_position="right")
+        fig.add_hrect(y0=20, y1=60, fillcolor="orange", opacity=0.1, line_width=0,
+                      annotation_text="CAUTION", annotation_position="right")
+        fig.add_hrect(y0=60, y1=100, fillcolor="red", opacity=0.1, line_width=0,
+                      annotation_text="DANGER", annotation_position="right")
         
-        hours.append(idx)
-        risks.append(risk)
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=hours, y=risks,
-        mode='lines+markers',
-        line=dict(color='rgb(102, 126, 234)', width=4),
-        marker=dict(size=12, color=risks, colorscale='RdYlGn_r', showscale=True,
-                    colorbar=dict(title="Risk %", thickness=15)),
-        hovertemplate='<b>Hour %{x}</b><br>Risk: %{y:.1f}%<extra></extra>'
-    ))
-    
-    fig.add_hrect(y0=0, y1=20, fillcolor="green", opacity=0.1, line_width=0, 
-                  annotation_text="SAFE ZONE", annotation_position="right")
-    fig.add_hrect(y0=20, y1=60, fillcolor="orange", opacity=0.1, line_width=0,
-                  annotation_text="CAUTION", annotation_position="right")
-    fig.add_hrect(y0=60, y1=100, fillcolor="red", opacity=0.1, line_width=0,
-                  annotation_text="DANGER", annotation_position="right")
-    
-    fig.add_vline(x=selected_hour, line_dash="dash", line_color="red", line_width=2,
-                  annotation_text="◀ NOW", annotation_position="top",
-                  annotation_font_size=14, annotation_font_color="red")
-    
-    title_suffix = " (TEST MODE - Simulated)" if test_mode else ""
-    fig.update_layout(
-        title=f"<b>Patient Risk Trend - Is Getting Better or Worse?{title_suffix}</b>",
-        xaxis_title="Hour in ICU",
-        yaxis_title="Risk %",
-        height=400,
-        template='plotly_white',
-        yaxis=dict(range=[0, 100]),
-        font=dict(size=13)
+        fig.add_vline(x=selected_hour, line_dash="dash", line_color="red", line_width=2,
+                      annotation_text="◀ NOW", annotation_position="top",
+                      annotation_font_size=14, annotation_font_color="red")
+        
+        title_suffix = " (TEST MODE - ★ = override)" if test_mode else ""
+        fig.update_layout(
+            title=f"<b>Patient Risk Trend - Is Getting Better or Worse?{title_suffix}</b>",
+            xaxis_title="Hour in ICU",
+            yaxis_title="Risk %",
+            height=400,
+            template='plotly_white',
+            yaxis=dict(range=[0, 100]),
+            yaxis2=dict(title="NEWS2", range=[0, 20], overlaying='y', side='right', showgrid=False),
+            showlegend=False,
+            font=dict(size=13)
+        )
+        
+        return fig
+    
+    # Rebuilt only when the patient, hour, override or data changes
+    fig = cache_budget.get_or_compute(
+        'figures', (selected_patient, selected_hour, test_mode, risk_percent, dataset_version, model_hash),
+        build_trend_figure
     )
     
     st.plotly_chart(fig, use_container_width=True)
@@ -924,6 +1143,117 @@ if len(patient_data) > 1:
         else:
             st.info("### ➡️ RISK STABLE - No major changes")
 
+# ============================================================
+# 🧪 WHAT-IF SIMULATION (TEST MODE)
+# ============================================================
+if test_mode:
+    st.markdown("<div class='section-title'>🧪 WHAT-IF SIMULATION - Real Model + Alert Path</div>", unsafe_allow_html=True)
+    
+    wf1, wf2 = st.columns([2, 1])
+    with wf1:
+        what_if_features = st.multiselect(
+            "Perturb these values:",
+            list(SCENARIO_PRESETS),
+            default=['Lactate', 'SBP'],
+            format_func=lambda f: f"{f} ({', '.join(f'{d:+g}' for d in SCENARIO_PRESETS[f][1:])})"
+        )
+    with wf2:
+        what_if_scope = st.selectbox("Run on:", ["This patient & hour", "Whole ward (latest hour)"])
+    
+    if what_if_features and st.button("▶️ RUN WHAT-IF GRID", use_container_width=True):
+        if what_if_scope.startswith("This"):
+            base_rows = current_obs.to_frame().T
+        else:
+            base_rows = df.sort_values('Hour').groupby('Patient_ID').tail(1)
+        
+        with st.spinner("Scoring all scenarios in one batch..."):
+            what_if_results, what_if_timings = run_what_if(
+                model, base_rows, feature_cols,
+                {f: SCENARIO_PRESETS[f] for f in what_if_features},
+                alert_engine=alert_engine if has_advanced_features else None,
+                treatment_engine=treatment_engine
+            )
+        
+        m1, m2, m3 = st.columns(3)
+        with m1:
+            st.metric("Scenarios scored", f"{what_if_timings['scenarios']:,}")
+        with m2:
+            st.metric("Model time", f"{what_if_timings['score_ms']:.0f} ms")
+        with m3:
+            st.metric("Alert path time", f"{what_if_timings['alert_ms']:.0f} ms")
+        
+        if what_if_scope.startswith("This") and len(what_if_features) == 2:
+            grid_risk = what_if_results.pivot_table(index=what_if_features[0], columns=what_if_features[1], values='risk')
+            fig_grid = go.Figure(go.Heatmap(
+                z=grid_risk.values, x=[f"{c:+g}" for c in grid_risk.columns], y=[f"{i:+g}" for i in grid_risk.index],
+                colorscale='RdYlGn_r', zmin=0, zmax=100, text=grid_risk.round(1).values, texttemplate="%{text}%",
+                colorbar=dict(title="Risk %")
+            ))
+            fig_grid.update_layout(
+                title="<b>Risk by Scenario</b>", xaxis_title=f"{what_if_features[1]} change",
+                yaxis_title=f"{what_if_features[0]} change", height=350, template='plotly_white'
+            )
+            st.plotly_chart(fig_grid, use_container_width=True)
+        
+        if what_if_scope.startswith("This"):
+            st.dataframe(what_if_results.drop(columns=['Patient_ID', 'Hour']), hide_index=True, use_container_width=True)
+        else:
+            summary = what_if_results.groupby(what_if_features).agg(
+                mean_risk=('risk', 'mean'),
+                high_band=('band', lambda b: int((b == 'HIGH').sum())),
+                antibiotics_1h=('antibiotics_1h', 'sum')
+            )
+            levels = what_if_results.pivot_table(index=what_if_features, columns='alert_level', aggfunc='size', fill_value=0)
+            st.dataframe(summary.join(levels).reset_index(), hide_index=True, use_container_width=True)
+
+# ============================================================
+# UNIT OVERVIEW - PRECOMPUTED ROLLUPS
+# ============================================================
+with st.expander("🏥 UNIT OVERVIEW - All Beds", expanded=False):
+    hourly = unit_store.series('hour', 24)
+    daily = unit_store.series('day', 7)
+    
+    if hourly['n'].sum() == 0 and daily['n'].sum() == 0:
+        st.info("No unit data yet - run the unit_aggregates backfill, then update after each append")
+    else:
+        latest = unit_store.latest_unit_hour()
+        st.caption(f"Rollups recorded up to {pd.to_datetime(latest * 3600, unit='s'):%Y-%m-%d %H:00} UTC "
+                   "by unit_aggregates.py update")
+        u1, u2, u3, u4 = st.columns(4)
+        with u1:
+            st.metric("Patient-hours (24h)", f"{hourly['n'].sum():.0f}")
+        with u2:
+            st.metric("High-risk hours (24h)", f"{hourly['band_high'].sum():.0f}")
+        with u3:
+            st.metric("Alerts (24h)", f"{hourly['alerts'].sum():.0f}")
+        with u4:
+            tta = daily['tta_sum'].sum() / daily['tta_n'].sum() if daily['tta_n'].sum() else None
+            st.metric("Mean time to alert (7d)", f"{tta:.1f} h" if tta is not None else "—")
+        
+        fig_bands = go.Figure()
+        for col, name, color in [('band_low', 'SAFE', '#00c853'), ('band_medium', 'CAUTION', '#ff9100'),
+                                 ('band_high', 'DANGER', '#ff1744')]:
+            fig_bands.add_trace(go.Bar(x=hourly['start'], y=hourly[col], name=name, marker_color=color))
+        fig_bands.update_layout(
+            barmode='stack', title="<b>Patients per Risk Band - Last 24h</b>",
+            height=320, template='plotly_white', xaxis_title="Hour", yaxis_title="Patients"
+        )
+        st.plotly_chart(fig_bands, use_container_width=True)
+        
+        d1, d2 = st.columns(2)
+        with d1:
+            hist = hourly[[f"h{i}" for i in range(10)]].sum()
+            fig_hist = go.Figure(go.Bar(
+                x=[f"{i * 10}-{i * 10 + 10}%" for i in range(10)], y=hist.values,
+                marker=dict(color=list(range(10)), colorscale='RdYlGn_r')
+            ))
+            fig_hist.update_layout(title="<b>Risk Distribution - Last 24h</b>", height=300, template='plotly_white')
+            st.plotly_chart(fig_hist, use_container_width=True)
+        with d2:
+            fig_alerts = go.Figure(go.Bar(x=daily['start'], y=daily['alerts'], marker_color='#ff1744'))
+            fig_alerts.update_layout(title="<b>Alerts per Day - Last 7d</b>", height=300, template='plotly_white')
+            st.plotly_chart(fig_alerts, use_container_width=True)
+
 # ============================================================
 # FOOTER
 # ============================================================
@@ -948,3 +1278,72 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+# ============================================================
+# LIVE MONITOR - DELTA UPDATES
+# ============================================================
+def run_live_monitor(patient_id, refresh_s):
+    """Keeps the live panel current without rerunning the page.
+
+    Only metrics whose displayed value changed are re-sent, and new hours
+    are appended to the chart with add_rows, so each update costs a few
+    small deltas instead of the full page, CSS and Plotly figure. Progress
+    is kept in session state: a rerun redraws the panel from it and reads
+    only hours after the last one seen. The panel follows the latest hour
+    while the cards and trend above stay on the hour picked with the slider.
+    """
+    state = st.session_state.get('live_monitor')
+    if state is None or state['patient_id'] != patient_id:
+        state = st.session_state['live_monitor'] = {
+            'patient_id': patient_id, 'version': None, 'last_hour': -1, 'snapshot': None,
+            'risks': pd.DataFrame({'Risk %': pd.Series(dtype=float)}),
+        }
+    
+    def show(key, value, change):
+        slots[key].metric(
+            LIVE_FIELDS[key][0], format_live_value(key, value),
+            delta=change, delta_color='inverse' if key in ('risk', 'NEWS2') else 'off'
+        )
+    
+    with live_panel:
+        st.markdown("<div class='section-title'>🔴 LIVE MONITOR - Latest Hour</div>", unsafe_allow_html=True)
+        status = st.empty()
+        slots = {key: col.empty() for key, col in zip(LIVE_FIELDS, st.columns(len(LIVE_FIELDS)))}
+        live_chart = st.line_chart(state['risks'], height=200)
+    for key, (value, _) in snapshot_delta(None, state['snapshot'] or {}).items():
+        show(key, value, None)
+    
+    # Earlier hours the NEWS2 carry-forward may still draw on
+    context_hours = max(CARRY_FORWARD_HOURS.values())
+    while True:
+        current_version = data_version()
+        if current_version != state['version']:
+            state['version'] = current_version
+            last_hour = state['last_hour']
+            rows = load_store().read(
+                patient_ids=[patient_id], hour_from=max(last_hour + 1 - context_hours, 0)
+            ).sort_values('Hour')
+            new_rows = rows[rows['Hour'] > last_hour]
+            
+            if len(new_rows):
+                new_risks = model.predict_proba(new_rows[feature_cols].fillna(0).values)[:, 1] * 100
+                new_points = pd.DataFrame({'Risk %': new_risks}, index=new_rows['Hour'].values)
+                live_chart.add_rows(new_points)
+                state['risks'] = pd.concat([state['risks'], new_points])
+                
+                for _, row in new_rows.iterrows():
+                    drift_monitor.observe(row, patient_id, row['Hour'])
+                latest = new_rows.iloc[-1]
+                latest_scores = compute_clinical_scores(rows).iloc[-1]
+                news2 = None if latest_scores['NEWS2_band'] == NEWS2_BAND_UNKNOWN else latest_scores['NEWS2']
+                snapshot = live_snapshot(latest['Hour'], new_risks[-1], latest, news2)
+                for key, (value, change) in snapshot_delta(state['snapshot'], snapshot).items():
+                    show(key, value, change)
+                state['snapshot'] = snapshot
+                state['last_hour'] = int(latest['Hour'])
+        
+        status.caption(f"🔴 LIVE - Hour {state['last_hour']} - checked {datetime.now().strftime('%H:%M:%S')}")
+        time.sleep(refresh_s)
+
+if live_mode:
+    run_live_monitor(selected_patient, live_refresh_s)
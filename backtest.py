@@ -0,0 +1,172 @@
+"""
+ALERT-POLICY BACKTESTING
+Replays every patient's stay hour by hour against SepsisLabel and reports
+sensitivity, alert burden and lead time for candidate alert policies
+
+    python backtest.py --data data/processed/sepsis_features_final.parquet \\
+                       --model models/xgboost_sepsis.pkl --cache-dir cache
+"""
+
+import argparse
+import itertools
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cohort_scoring import load_scored_cohort
+from time_series_store import add_store_arguments, store_from_args
+
+# threshold:      alert when risk % >= threshold
+# persist_hours:  ...for this many consecutive hours
+# repeat_hours:   re-alert every N hours while it persists (0 = once per episode)
+# min_news2:      additionally require NEWS2 >= this
+AlertPolicy = namedtuple('AlertPolicy', 'name threshold persist_hours repeat_hours min_news2')
+
+
+def policy(threshold, persist_hours=1, repeat_hours=0, min_news2=0, name=None):
+    if name is None:
+        name = f"risk>={threshold:g}% x{persist_hours}h"
+        if repeat_hours:
+            name += f" every {repeat_hours}h"
+        if min_news2:
+            name += f" & NEWS2>={min_news2}"
+    return AlertPolicy(name, threshold, persist_hours, repeat_hours, min_news2)
+
+
+# The dashboard's current bands plus a grid around them
+DEFAULT_POLICIES = (
+    [policy(20, name="dashboard CAUTION (>=20%)"), policy(60, name="dashboard DANGER (>=60%)")]
+    + [policy(t, p) for t, p in itertools.product((10, 30, 40, 50, 70, 80), (1, 2, 3))]
+    + [policy(t, 1, min_news2=5) for t in (20, 40, 60)]
+    + [policy(t, 2, repeat_hours=6) for t in (40, 60)]
+)
+
+
+# ============================================================
+# REPLAY
+# ============================================================
+_cohort = None
+
+
+def _init_worker(cohort):
+    global _cohort
+    _cohort = cohort
+
+
+def prepare_cohort(scored, max_lead_hours=48):
+    """Flat arrays shared by every policy evaluation (scored must be sorted by patient, hour)"""
+    patient = pd.factorize(scored['Patient_ID'])[0]
+    hour = scored['Hour'].to_numpy(dtype=np.int64)
+    label = scored['SepsisLabel'].to_numpy(dtype=bool) if 'SepsisLabel' in scored else np.zeros(len(scored), bool)
+
+    n_patients = patient.max() + 1 if len(patient) else 0
+    onset = np.full(n_patients, np.inf)
+    np.minimum.at(onset, patient[label], hour[label])
+
+    return {
+        'patient': patient,
+        'hour': hour,
+        'patient_start': np.r_[True, patient[1:] != patient[:-1]],
+        'risk': scored['risk'].to_numpy(dtype=float),
+        'news2': scored['NEWS2'].to_numpy(dtype=float) if 'NEWS2' in scored else np.zeros(len(scored)),
+        'onset': onset,
+        'max_lead_hours': max_lead_hours,
+    }
+
+
+def alert_hours(cohort, pol):
+    """Boolean mask of the rows at which the policy fires"""
+    above = (cohort['risk'] >= pol.threshold) & (cohort['news2'] >= pol.min_news2)
+
+    # Length of the current run of consecutive above-threshold hours per patient
+    idx = np.arange(len(above))
+    anchor = np.where(~above, idx, np.where(cohort['patient_start'], idx - 1, -1))
+    run = np.where(above, idx - np.maximum.accumulate(anchor), 0)
+
+    if pol.repeat_hours:
+        return (run >= pol.persist_hours) & ((run - pol.persist_hours) % pol.repeat_hours == 0)
+    return run == pol.persist_hours
+
+
+def evaluate_policy(pol, cohort=None):
+    cohort = cohort if cohort is not None else _cohort
+    patient, hour, onset = cohort['patient'], cohort['hour'], cohort['onset']
+    fired = alert_hours(cohort, pol)
+
+    alert_patient = patient[fired]
+    alert_hour = hour[fired]
+    alert_onset = onset[alert_patient]
+    in_window = (alert_hour <= alert_onset) & (alert_hour >= alert_onset - cohort['max_lead_hours'])
+
+    # Earliest timely alert per septic patient
+    first_alert = np.full(len(onset), np.inf)
+    np.minimum.at(first_alert, alert_patient[in_window], alert_hour[in_window])
+
+    septic = np.isfinite(onset)
+    detected = septic & np.isfinite(first_alert)
+    lead = onset[detected] - first_alert[detected]
+
+    alerted = np.zeros(len(onset), dtype=bool)
+    alerted[alert_patient] = True
+    n_alerts = int(fired.sum())
+    bed_days = len(hour) / 24
+
+    return {
+        'policy': pol.name,
+        'sensitivity': detected.sum() / septic.sum() if septic.any() else np.nan,
+        'false_alarm_patients': (alerted & ~septic).sum() / (~septic).sum() if (~septic).any() else np.nan,
+        'alert_ppv': in_window.sum() / n_alerts if n_alerts else np.nan,
+        'alerts_per_bed_day': n_alerts / bed_days if bed_days else np.nan,
+        'median_lead_h': float(np.median(lead)) if len(lead) else np.nan,
+        'mean_lead_h': float(lead.mean()) if len(lead) else np.nan,
+        'alerts': n_alerts,
+    }
+
+
+def run_backtest(scored, policies=DEFAULT_POLICIES, workers=None, max_lead_hours=48):
+    """Evaluate every policy in parallel; returns one row of metrics per policy"""
+    cohort = prepare_cohort(scored, max_lead_hours)
+    workers = workers or min(len(policies), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [evaluate_policy(pol, cohort) for pol in policies]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cohort,)) as pool:
+            results = list(pool.map(evaluate_policy, policies))
+    return pd.DataFrame(results)
+
+
+def parse_policy(spec):
+    """'threshold[:persist[:repeat[:min_news2]]]', e.g. '60:2:6'"""
+    parts = [float(p) for p in spec.split(':')]
+    return policy(parts[0], *(int(p) for p in parts[1:]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest alert policies against SepsisLabel")
+    add_store_arguments(parser)
+    parser.add_argument('--model', required=True, help="xgboost_sepsis.pkl")
+    parser.add_argument('--cache-dir', default=None, help="Reuse/store the scored cohort here")
+    parser.add_argument('--policy', action='append', type=parse_policy,
+                        help="Candidate policy threshold[:persist[:repeat[:min_news2]]] (repeatable)")
+    parser.add_argument('--max-lead-hours', type=int, default=48,
+                        help="Alerts earlier than this before onset do not count as detections")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=None, help="Write results CSV here")
+    args = parser.parse_args()
+
+    scored = load_scored_cohort(store_from_args(args), args.model, args.cache_dir)
+    results = run_backtest(scored, args.policy or DEFAULT_POLICIES, args.workers, args.max_lead_hours)
+    results = results.sort_values(['sensitivity', 'alerts_per_bed_day'], ascending=[False, True])
+
+    with pd.option_context('display.max_rows', None, 'display.width', 160, 'display.precision', 3):
+        print(results.to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+MICRO-BATCHING BENCHMARK
+Concurrent single-row predict_proba throughput: per-call vs MicroBatcher
+
+    python bench_batching.py --model models/xgboost_sepsis.pkl --threads 32
+"""
+
+import argparse
+import threading
+import time
+
+import joblib
+import numpy as np
+
+from micro_batching import BatchedModel
+
+
+def _synthetic_model(n_features):
+    """Small XGBoost model for running the benchmark without the trained one"""
+    from xgboost import XGBClassifier
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(5000, n_features))
+    y = (X[:, 0] + rng.normal(size=5000) > 1).astype(int)
+    return XGBClassifier(n_estimators=200, max_depth=6).fit(X, y)
+
+
+def _n_features(model, default):
+    return getattr(model, 'n_features_in_', None) or default
+
+
+def run_load(predict_proba, rows, n_threads, calls_per_thread):
+    """Hammer predict_proba with single-row calls from n_threads; returns (calls/s, p50 ms, p99 ms)"""
+    latencies = [[] for _ in range(n_threads)]
+    barrier = threading.Barrier(n_threads + 1)
+
+    def worker(t):
+        barrier.wait()
+        for i in range(calls_per_thread):
+            x = rows[(t * calls_per_thread + i) % len(rows)].reshape(1, -1)
+            start = time.perf_counter()
+            predict_proba(x)
+            latencies[t].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_ms = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    return n_threads * calls_per_thread / elapsed, np.percentile(all_ms, 50), np.percentile(all_ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched vs per-call predict_proba")
+    parser.add_argument('--model', default=None, help="Path to a joblib model (default: synthetic XGBoost)")
+    parser.add_argument('--features', type=int, default=40)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--calls', type=int, default=200, help="Calls per thread")
+    parser.add_argument('--max-wait-ms', type=float, nargs='+', default=[0.0, 1.0, 5.0])
+    parser.add_argument('--max-batch-size', type=int, nargs='+', default=[64, 128, 256])
+    args = parser.parse_args()
+
+    model = joblib.load(args.model) if args.model else _synthetic_model(args.features)
+    rows = np.random.default_rng(1).normal(size=(1000, _n_features(model, args.features)))
+    model.predict_proba(rows[:1])
+
+    print(f"{'mode':<28}{'calls/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'speedup':>10}{'avg batch':>11}")
+    baseline, p50, p99 = run_load(model.predict_proba, rows, args.threads, args.calls)
+    print(f"{'per-call':<28}{baseline:>12.0f}{p50:>10.2f}{p99:>10.2f}{1.0:>10.2f}{1.0:>11.1f}")
+
+    for max_wait_ms in args.max_wait_ms:
+        for max_batch_size in args.max_batch_size:
+            batched = BatchedModel(model, max_wait_ms=max_wait_ms, max_batch_size=max_batch_size)
+            throughput, p50, p99 = run_load(batched.predict_proba, rows, args.threads, args.calls)
+            label = f"batched wait={max_wait_ms}ms max={max_batch_size}"
+            print(f"{label:<28}{throughput:>12.0f}{p50:>10.2f}{p99:>10.2f}"
+                  f"{throughput / baseline:>10.2f}{batched.batcher.mean_batch_size:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+IN-MEMORY CACHE BUDGET
+One process-wide, size-aware LRU for everything the dashboard keeps in
+memory (dataset, predictions, explanations, figures) under a global ceiling
+"""
+
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_size(value):
+    """Approximate bytes held by a cached value"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'to_plotly_json'):
+        return len(value.to_json())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class CacheBudget:
+    """Thread-safe LRU keyed by (namespace, key), evicting by bytes.
+
+    Values are shared, not copied, between sessions: callers must treat
+    them as read-only. Pinned entries (the dataset) are never evicted and
+    shrink the room left for everything else; ``over_budget`` reports when
+    they alone exceed the ceiling. An unpinned value larger than the room
+    left is returned but not kept. Concurrent misses on the same key
+    compute it once, so two sessions never load the dataset side by side.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.pinned_bytes = 0
+        self._entries = OrderedDict()
+        self._pinned = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._counters = defaultdict(lambda: {'hits': 0, 'misses': 0, 'evictions': 0, 'rejected': 0})
+
+    @property
+    def over_budget(self):
+        return self.pinned_bytes > self.max_bytes
+
+    def get(self, namespace, key, count=True):
+        """Cached value or None, counting a hit or miss"""
+        with self._lock:
+            entry = self._pinned.get((namespace, key))
+            if entry is None:
+                entry = self._entries.get((namespace, key))
+                if entry is not None:
+                    self._entries.move_to_end((namespace, key))
+            if count:
+                self._counters[namespace]['misses' if entry is None else 'hits'] += 1
+            return None if entry is None else entry[0]
+
+    def _remove(self, full_key):
+        for entries in (self._entries, self._pinned):
+            old = entries.pop(full_key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+                if entries is self._pinned:
+                    self.pinned_bytes -= old[1]
+
+    def put(self, namespace, key, value, size=None, pin=False):
+        """Store a value, evicting least recently used unpinned entries to stay under budget"""
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            counters = self._counters[namespace]
+            self._remove((namespace, key))
+            if pin:
+                self._pinned[(namespace, key)] = (value, size)
+                self.pinned_bytes += size
+            elif size > self.max_bytes - self.pinned_bytes:
+                counters['rejected'] += 1
+                return False
+            else:
+                self._entries[(namespace, key)] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and self._entries:
+                (evicted_ns, _), (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self._counters[evicted_ns]['evictions'] += 1
+            return True
+
+    @contextmanager
+    def _key_lock(self, full_key):
+        # One lock per key in flight, so slow computations only block their own key
+        with self._lock:
+            entry = self._key_locks.setdefault(full_key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[full_key]
+
+    def get_or_compute(self, namespace, key, compute, size=None, pin=False):
+        value = self.get(namespace, key)
+        if value is not None:
+            return value
+        with self._key_lock((namespace, key)):
+            # Another session may have computed it while we waited
+            value = self.get(namespace, key, count=False)
+            if value is not None:
+                return value
+            value = compute()
+            self.put(namespace, key, value, size, pin)
+            return value
+
+    def discard(self, namespace, predicate=None):
+        """Drop a namespace's entries (those whose key matches ``predicate``), e.g. stale data versions"""
+        with self._lock:
+            stale = [k for k in [*self._entries, *self._pinned]
+                     if k[0] == namespace and (predicate is None or predicate(k[1]))]
+            for k in stale:
+                self._remove(k)
+            return len(stale)
+
+    def stats(self):
+        """Entries, bytes and hit/miss/eviction counters per namespace"""
+        with self._lock:
+            usage = defaultdict(lambda: [0, 0])
+            for (namespace, _), (_, size) in [*self._entries.items(), *self._pinned.items()]:
+                usage[namespace][0] += 1
+                usage[namespace][1] += size
+            records = [
+                {'namespace': ns, 'entries': usage[ns][0], 'mb': usage[ns][1] / 2**20, **counters}
+                for ns, counters in sorted(self._counters.items())
+            ]
+        frame = pd.DataFrame(records, columns=['namespace', 'entries', 'mb', 'hits', 'misses', 'evictions', 'rejected'])
+        lookups = frame['hits'] + frame['misses']
+        frame['hit_rate'] = frame['hits'] / lookups.where(lookups > 0)
+        return frame
@@ -0,0 +1,117 @@
+"""
+CLINICAL EARLY-WARNING SCORES
+SIRS, qSOFA and NEWS2 computed in bulk from the raw vital and lab columns
+"""
+
+import numpy as np
+import pandas as pd
+
+# Raw PhysioNet columns used by the scores (missing columns score as normal)
+SCORE_INPUT_COLS = ['HR', 'Resp', 'Temp', 'SBP', 'O2Sat', 'FiO2', 'PaCO2', 'WBC']
+SCORE_COLS = ['SIRS', 'qSOFA', 'NEWS2', 'NEWS2_band']
+
+# Too few current vitals to call the clinical risk Low
+NEWS2_BAND_UNKNOWN = -1
+NEWS2_BAND_NAMES = {NEWS2_BAND_UNKNOWN: 'Not enough data', 0: 'Low', 1: 'Medium', 2: 'High'}
+MIN_NEWS2_PARAMS = 3
+
+# Hours a reading is carried forward before it counts as missing again
+CARRY_FORWARD_HOURS = {
+    'HR': 4, 'Resp': 4, 'Temp': 4, 'SBP': 4, 'O2Sat': 4, 'FiO2': 4,
+    'PaCO2': 24, 'WBC': 24,
+}
+
+# NEWS2 parameter bands: upper edges (inclusive) and the points of each band
+_NEWS2_RESP = ([8, 11, 20, 24], [3, 1, 0, 2, 3])
+_NEWS2_SPO2 = ([91, 93, 95], [3, 2, 1, 0])
+_NEWS2_SBP = ([90, 100, 110, 219], [3, 2, 1, 0, 3])
+_NEWS2_HR = ([40, 50, 90, 110, 130], [3, 1, 0, 1, 2, 3])
+_NEWS2_TEMP = ([35.0, 36.0, 38.0, 39.0], [3, 1, 0, 1, 2])
+
+
+def _banded_points(values, bands):
+    """Map values onto NEWS2 points; missing values score 0"""
+    edges, points = bands
+    idx = np.digitize(values, edges, right=True)
+    scored = np.asarray(points, dtype=np.int8)[idx]
+    return np.where(np.isnan(values), 0, scored).astype(np.int8)
+
+
+def _column(frame, col):
+    if col in frame.columns:
+        return frame[col].to_numpy(dtype=float, na_value=np.nan)
+    return np.full(len(frame), np.nan)
+
+
+def _carry_forward(raw, patient, hour):
+    """Last reading within each stay, dropped once older than CARRY_FORWARD_HOURS"""
+    filled = raw.groupby(patient).ffill()
+    seen_at = pd.DataFrame(np.where(raw.notna(), hour[:, None], np.nan), index=raw.index, columns=raw.columns)
+    age = hour[:, None] - seen_at.groupby(patient).ffill().to_numpy()
+    limits = np.array([CARRY_FORWARD_HOURS[c] for c in raw.columns], dtype=float)
+    return filled.where(age <= limits)
+
+
+def compute_clinical_scores(df):
+    """Compute SIRS, qSOFA and NEWS2 for every patient-hour in one vectorized pass.
+
+    Vitals and labs are carried forward within each patient's stay, as they
+    would be at the bedside, for at most CARRY_FORWARD_HOURS. When fewer than
+    MIN_NEWS2_PARAMS vitals are current a Low NEWS2 band is reported as
+    NEWS2_BAND_UNKNOWN instead. Mentation/consciousness is not recorded in the
+    dataset, so qSOFA tops out at 2 and NEWS2 has no ACVPU component.
+    Returns a DataFrame with SCORE_COLS aligned to ``df.index``.
+    """
+    present = [c for c in SCORE_INPUT_COLS if c in df.columns]
+    ordered = df.sort_values(['Patient_ID', 'Hour'])
+    raw = ordered[present].apply(pd.to_numeric, errors='coerce')
+    filled = _carry_forward(raw, ordered['Patient_ID'].to_numpy(), ordered['Hour'].to_numpy(dtype=float))
+
+    hr = _column(filled, 'HR')
+    rr = _column(filled, 'Resp')
+    temp = _column(filled, 'Temp')
+    sbp = _column(filled, 'SBP')
+    spo2 = _column(filled, 'O2Sat')
+    fio2 = _column(filled, 'FiO2')
+    paco2 = _column(filled, 'PaCO2')
+    wbc = _column(filled, 'WBC')
+
+    # NaN comparisons are False, so missing values never add points
+    with np.errstate(invalid='ignore'):
+        sirs = (
+            ((temp > 38.0) | (temp < 36.0)).astype(np.int8)
+            + (hr > 90).astype(np.int8)
+            + ((rr > 20) | (paco2 < 32)).astype(np.int8)
+            + ((wbc > 12) | (wbc < 4)).astype(np.int8)
+        )
+        qsofa = (rr >= 22).astype(np.int8) + (sbp <= 100).astype(np.int8)
+
+        # FiO2 is stored as a fraction; tolerate percentages too
+        fio2 = np.where(fio2 > 1, fio2 / 100.0, fio2)
+        supplemental_o2 = np.where(fio2 > 0.21, 2, 0).astype(np.int8)
+
+    components = np.column_stack([
+        _banded_points(rr, _NEWS2_RESP),
+        _banded_points(spo2, _NEWS2_SPO2),
+        supplemental_o2,
+        _banded_points(sbp, _NEWS2_SBP),
+        _banded_points(hr, _NEWS2_HR),
+        _banded_points(temp, _NEWS2_TEMP),
+    ])
+    news2 = components.sum(axis=1).astype(np.int8)
+
+    # NEWS2 clinical risk: high >= 7, medium 5-6 or any single parameter scoring 3
+    news2_band = np.select(
+        [news2 >= 7, (news2 >= 5) | (components.max(axis=1) == 3)],
+        [2, 1],
+        default=0,
+    ).astype(np.int8)
+    # Missing vitals score 0, so a Low band needs enough of them to mean anything
+    n_current = np.isfinite(np.column_stack([rr, spo2, sbp, hr, temp])).sum(axis=1)
+    news2_band[(news2_band == 0) & (n_current < MIN_NEWS2_PARAMS)] = NEWS2_BAND_UNKNOWN
+
+    scores = pd.DataFrame(
+        {'SIRS': sirs, 'qSOFA': qsofa, 'NEWS2': news2, 'NEWS2_band': news2_band},
+        index=ordered.index,
+    )
+    return scores.reindex(df.index)
@@ -0,0 +1,64 @@
+"""
+COHORT SCORING
+Batch model risk + clinical scores for every patient-hour, cached per model version
+"""
+
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from clinical_scores import compute_clinical_scores
+from result_cache import file_hash
+from time_series_store import store_id
+
+EXCLUDE_COLS = ['SepsisLabel', 'Patient_ID', 'Hour', 'ICULOS', 'Unnamed: 0']
+
+# Raw columns carried into the scored cohort for alerting, rules and reports
+CONTEXT_COLS = ['Patient_ID', 'Hour', 'SepsisLabel', 'HR', 'O2Sat', 'Temp', 'SBP', 'DBP', 'Resp', 'Lactate']
+
+
+def feature_columns(df):
+    """Model input columns, in training order"""
+    return [col for col in df.columns if col not in EXCLUDE_COLS]
+
+
+def score_cohort(model, df, feature_cols=None, chunk_size=200_000):
+    """Risk % for every row of df, scored in large chunks"""
+    feature_cols = feature_cols or feature_columns(df)
+    risk = np.empty(len(df), dtype=np.float32)
+    for start in range(0, len(df), chunk_size):
+        X = df[feature_cols].iloc[start:start + chunk_size].fillna(0).values
+        risk[start:start + chunk_size] = model.predict_proba(X)[:, 1] * 100
+    return risk
+
+
+def build_scored_cohort(model, df):
+    """Context columns + risk + SIRS/qSOFA/NEWS2, sorted by patient and hour"""
+    scored = df[[c for c in CONTEXT_COLS if c in df.columns]].copy()
+    scored['risk'] = score_cohort(model, df)
+    scored = scored.join(compute_clinical_scores(df))
+    return scored.sort_values(['Patient_ID', 'Hour'], kind='stable').reset_index(drop=True)
+
+
+def load_scored_cohort(store, model_path, cache_dir=None):
+    """Scored cohort of a time-series store, reusing the parquet cached for this model and store version"""
+    model_path = Path(model_path)
+    cache_path = None
+    if cache_dir is not None:
+        cache_dir = Path(cache_dir)
+        prefix = f"scored_cohort_{file_hash(model_path)}_{store_id(store)}"
+        # Read the version before the data: a concurrent append then only costs a rescore
+        cache_path = cache_dir / f"{prefix}_v{store.version()}.parquet"
+        if cache_path.exists():
+            return pd.read_parquet(cache_path)
+
+    scored = build_scored_cohort(joblib.load(model_path), store.read())
+    if cache_path is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        scored.to_parquet(cache_path, index=False)
+        for stale in cache_dir.glob(f"{prefix}_v*.parquet"):
+            if stale != cache_path:
+                stale.unlink(missing_ok=True)
+    return scored
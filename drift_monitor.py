@@ -0,0 +1,250 @@
+"""
+STREAMING DATA-QUALITY & DRIFT MONITOR
+Constant-memory sketches of every scored feature row, compared against a
+reference profile of the training parquet
+
+    python drift_monitor.py profile --data data/processed/sepsis_features_final.parquet \\
+                                    --output models/reference_profile.json
+"""
+
+import argparse
+import json
+import threading
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+import pandas as pd
+
+from cohort_scoring import feature_columns
+from time_series_store import add_store_arguments, store_from_args
+
+# Dashboard vital columns that get_realistic_vital replaces when out of range
+VITAL_COLS = ['HR', 'SBP', 'DBP', 'O2Sat', 'Temp', 'Resp']
+N_BINS = 10
+PSI_DRIFT = 0.2
+MISSING_DRIFT = 0.15
+MIN_DRIFT_COUNT = 200
+MAX_PATIENTS = 512
+MAX_SEEN_ROWS = 20000
+
+
+# ============================================================
+# T-DIGEST
+# ============================================================
+class TDigest:
+    """Merging t-digest: quantile estimates in O(compression) memory"""
+
+    def __init__(self, compression=200, buffer_size=500):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer = []
+
+    def add(self, value):
+        self._buffer.append(value)
+        if len(self._buffer) >= self.buffer_size:
+            self._merge()
+
+    def _merge(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means, self._buffer])
+        weights = np.concatenate([self.weights, np.ones(len(self._buffer))])
+        self._buffer = []
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        # k1 scale function: centroids stay small near the tails
+        q_right = np.cumsum(weights) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * np.clip(q_right, 0, 1) - 1)
+        cluster = np.floor(k).astype(int)
+        _, start = np.unique(cluster, return_index=True)
+        merged_w = np.add.reduceat(weights, start)
+        self.means = np.add.reduceat(means * weights, start) / merged_w
+        self.weights = merged_w
+
+    @property
+    def count(self):
+        return self.weights.sum() + len(self._buffer)
+
+    def quantile(self, q):
+        self._merge()
+        if not len(self.means):
+            return np.nan
+        if len(self.means) == 1:
+            return float(self.means[0])
+        centers = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        return float(np.interp(q, centers, self.means))
+
+
+# ============================================================
+# SKETCHES
+# ============================================================
+class FeatureSketch:
+    """Count, missing, out-of-range and binned counts for one feature"""
+
+    __slots__ = ('count', 'missing', 'invalid', 'bin_counts', 'digest')
+
+    def __init__(self, n_bins=N_BINS, with_digest=True):
+        self.count = 0
+        self.missing = 0
+        self.invalid = 0
+        self.bin_counts = np.zeros(n_bins, dtype=np.int64)
+        self.digest = TDigest() if with_digest else None
+
+    def update(self, value, bin_idx, invalid):
+        self.count += 1
+        if bin_idx < 0:
+            self.missing += 1
+            return
+        self.invalid += invalid
+        self.bin_counts[bin_idx] += 1
+        if self.digest is not None:
+            self.digest.add(value)
+
+    @property
+    def missing_rate(self):
+        return self.missing / self.count if self.count else 0.0
+
+
+def psi(expected, observed, eps=1e-4):
+    """Population stability index between two binned distributions"""
+    expected = np.asarray(expected, dtype=float)
+    observed = np.asarray(observed, dtype=float)
+    if observed.sum() == 0 or expected.sum() == 0:
+        return 0.0
+    e = np.clip(expected / expected.sum(), eps, None)
+    o = np.clip(observed / observed.sum(), eps, None)
+    return float(np.sum((o - e) * np.log(o / e)))
+
+
+def build_reference_profile(df, features=None, n_bins=N_BINS):
+    """Per-feature missing rate, decile bin edges and bin proportions of the training data"""
+    features = features or feature_columns(df)
+    profile = {}
+    for col in features:
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+        present = values[~np.isnan(values)]
+        if len(present):
+            edges = np.unique(np.quantile(present, np.linspace(0, 1, n_bins + 1)[1:-1]))
+            counts = np.bincount(np.searchsorted(edges, present, side='right'), minlength=n_bins)
+        else:
+            edges, counts = np.empty(0), np.zeros(n_bins, dtype=int)
+        profile[col] = {
+            'missing_rate': float(np.isnan(values).mean()) if len(values) else 0.0,
+            'edges': edges.tolist(),
+            'bin_counts': counts[:n_bins].tolist(),
+            'quantiles': {str(q): float(np.quantile(present, q)) for q in (0.05, 0.5, 0.95)} if len(present) else {},
+        }
+    return profile
+
+
+class DriftMonitor:
+    """Inline monitor for every scored row.
+
+    Global and per-hour-of-stay sketches keep t-digests; per-patient sketches
+    keep counts only and are capped at ``max_patients`` (least recently seen
+    dropped), so memory does not grow with traffic. Re-observing a recently
+    seen (patient, hour), e.g. on a page rerun, is a no-op.
+    """
+
+    def __init__(self, reference, max_patients=MAX_PATIENTS):
+        self.reference = reference
+        self.features = list(reference)
+        self._edges = [np.asarray(reference[f]['edges']) for f in self.features]
+        self._vital_idx = [i for i, f in enumerate(self.features) if f in VITAL_COLS]
+        self.max_patients = max_patients
+        self.rows = 0
+        self.global_ = [FeatureSketch() for _ in self.features]
+        self.by_hour = defaultdict(lambda: [FeatureSketch() for _ in self.features])
+        self.by_patient = OrderedDict()
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, row, patient_id=None, hour=None):
+        """Update every sketch with one feature row (a Series or mapping)"""
+        if patient_id is not None and hour is not None:
+            key = (patient_id, int(hour))
+            with self._lock:
+                if key in self._seen:
+                    return
+                self._seen[key] = None
+                if len(self._seen) > MAX_SEEN_ROWS:
+                    self._seen.popitem(last=False)
+
+        values = np.array([row.get(f, np.nan) for f in self.features], dtype=float)
+        missing = np.isnan(values)
+        bins = np.array([np.searchsorted(e, v, side='right') for e, v in zip(self._edges, values)])
+        bins = np.where(missing, -1, np.minimum(bins, N_BINS - 1))
+        invalid = np.zeros(len(values), dtype=bool)
+        invalid[self._vital_idx] = ~missing[self._vital_idx] & (
+            (values[self._vital_idx] <= 0) | (values[self._vital_idx] >= 1000)
+        )
+
+        with self._lock:
+            self.rows += 1
+            targets = [self.global_]
+            if hour is not None:
+                targets.append(self.by_hour[min(int(hour), 48)])
+            if patient_id is not None:
+                if patient_id not in self.by_patient:
+                    self.by_patient[patient_id] = [FeatureSketch(with_digest=False) for _ in self.features]
+                    if len(self.by_patient) > self.max_patients:
+                        self.by_patient.popitem(last=False)
+                self.by_patient.move_to_end(patient_id)
+                targets.append(self.by_patient[patient_id])
+
+            for sketches in targets:
+                for i, sketch in enumerate(sketches):
+                    sketch.update(values[i], bins[i], invalid[i])
+
+    def report(self, sketches=None):
+        """Per-feature quality/drift table for global (default), by_hour[h] or by_patient[id] sketches"""
+        sketches = sketches if sketches is not None else self.global_
+        records = []
+        for feature, sketch in zip(self.features, sketches):
+            ref = self.reference[feature]
+            score = psi(ref['bin_counts'], sketch.bin_counts)
+            missing_shift = sketch.missing_rate - ref['missing_rate']
+            enough = sketch.count >= MIN_DRIFT_COUNT
+            records.append({
+                'feature': feature,
+                'count': sketch.count,
+                'missing_rate': sketch.missing_rate,
+                'ref_missing_rate': ref['missing_rate'],
+                'out_of_range': sketch.invalid,
+                'p50': sketch.digest.quantile(0.5) if sketch.digest else np.nan,
+                'ref_p50': ref['quantiles'].get('0.5', np.nan),
+                'psi': score,
+                'drift': enough and (score > PSI_DRIFT or abs(missing_shift) > MISSING_DRIFT),
+            })
+        return pd.DataFrame(records)
+
+    def drift_flags(self):
+        report = self.report()
+        return report.loc[report['drift'], 'feature'].tolist()
+
+
+def load_reference_profile(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the drift monitor reference profile")
+    sub = parser.add_subparsers(dest='command', required=True)
+    prof = sub.add_parser('profile', help="Profile the training parquet")
+    add_store_arguments(prof)
+    prof.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    profile = build_reference_profile(store_from_args(args).read())
+    with open(args.output, 'w') as f:
+        json.dump(profile, f)
+    print(f"Reference profile for {len(profile)} features written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
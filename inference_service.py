@@ -0,0 +1,199 @@
+"""
+LOCAL INFERENCE SERVICE
+Owns the XGBoost model and SHAP explainer in a separate process and serves
+every dashboard session over a Unix socket, micro-batching predictions
+
+    ICU_INFERENCE_AUTHKEY=<secret> python inference_service.py --socket /tmp/icu-inference.sock
+
+Messages are pickled, so the shared secret in ICU_INFERENCE_AUTHKEY is
+required on both sides: connections that fail the handshake are dropped
+before anything is unpickled.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from micro_batching import MicroBatcher
+from result_cache import file_hash
+
+DEFAULT_SOCKET = '/tmp/icu-inference.sock'
+AUTHKEY_ENV = 'ICU_INFERENCE_AUTHKEY'
+
+
+def authkey_from_env():
+    authkey = os.environ.get(AUTHKEY_ENV)
+    if not authkey:
+        raise RuntimeError(f"Set {AUTHKEY_ENV} to a shared secret for the inference service")
+    return authkey.encode()
+
+
+# ============================================================
+# SERVER
+# ============================================================
+_worker_explainer = None
+
+
+def _init_explainer(model_path, project_folder):
+    global _worker_explainer
+    sys.path.insert(0, str(project_folder))
+    try:
+        from src.explainer.shap_explainer import SepsisExplainer
+        _worker_explainer = SepsisExplainer(model_path=str(model_path))
+        _worker_explainer.load_explainer()
+    except Exception:
+        _worker_explainer = None
+
+
+def _explain(X, feature_cols):
+    if _worker_explainer is None:
+        raise RuntimeError("SHAP explainer is not available in the inference service")
+    return _worker_explainer.explain_patient(X, feature_cols)
+
+
+class InferenceServer:
+    """Unix-socket RPC server: one thread per client connection, one batcher
+    for predictions and a process pool for SHAP explanations"""
+
+    def __init__(self, model_path, socket_path=DEFAULT_SOCKET, authkey=None,
+                 project_folder=None, explain_workers=2, max_wait_ms=1.0, max_batch_size=256):
+        self.socket_path = socket_path
+        self.authkey = authkey or authkey_from_env()
+        self.model_hash = file_hash(model_path)
+        self.batcher = MicroBatcher(joblib.load(model_path).predict_proba, max_wait_ms, max_batch_size)
+        self.explain_pool = None
+        if explain_workers > 0:
+            project_folder = project_folder or Path(model_path).resolve().parent.parent
+            # Workers start lazily from a handler thread after XGBoost/OpenMP has run in
+            # this process; forking then can deadlock the child, so spawn them fresh
+            self.explain_pool = ProcessPoolExecutor(
+                max_workers=explain_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_explainer,
+                initargs=(model_path, project_folder),
+            )
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    op, payload = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if op == 'predict_proba':
+                        result = self.batcher.submit(payload).result()
+                    elif op == 'explain_patient':
+                        if self.explain_pool is None:
+                            raise RuntimeError("SHAP explanations are disabled in the inference service")
+                        result = self.explain_pool.submit(_explain, *payload).result()
+                    elif op == 'ping':
+                        result = 'pong'
+                    elif op == 'model_hash':
+                        result = self.model_hash
+                    else:
+                        raise ValueError(f"Unknown operation: {op}")
+                    conn.send(('ok', result))
+                except Exception as e:
+                    conn.send(('error', f"{type(e).__name__}: {e}"))
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        # Create the socket owner/group-only rather than chmod-ing it after bind
+        umask = os.umask(0o117)
+        try:
+            listener = Listener(self.socket_path, family='AF_UNIX', authkey=self.authkey)
+        finally:
+            os.umask(umask)
+        with listener:
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception:
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+
+# ============================================================
+# CLIENT
+# ============================================================
+class InferenceClient:
+    """Drop-in stand-in for the model and explainer inside the dashboard.
+
+    Each thread (Streamlit session) keeps its own connection; a dropped
+    connection is re-opened once before the error is raised.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, authkey=None):
+        self.socket_path = socket_path
+        self.authkey = authkey or authkey_from_env()
+        self._local = threading.local()
+
+    def _conn(self, reconnect=False):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or reconnect:
+            conn = Client(self.socket_path, family='AF_UNIX', authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def _call(self, op, payload):
+        for attempt in range(2):
+            try:
+                conn = self._conn(reconnect=attempt > 0)
+                conn.send((op, payload))
+                status, result = conn.recv()
+                break
+            except (EOFError, OSError):
+                if attempt:
+                    raise
+        if status == 'error':
+            raise RuntimeError(result)
+        return result
+
+    def ping(self):
+        return self._call('ping', None) == 'pong'
+
+    def model_hash(self):
+        """Hash of the model file the service loaded, for result-cache keys"""
+        return self._call('model_hash', None)
+
+    def predict_proba(self, X):
+        return self._call('predict_proba', np.asarray(X, dtype=float))
+
+    def explain_patient(self, X, feature_cols):
+        return self._call('explain_patient', (np.asarray(X, dtype=float), list(feature_cols)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve sepsis model inference over a Unix socket")
+    parser.add_argument('--model', required=True, help="Path to xgboost_sepsis.pkl")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--project-folder', default=None,
+                        help="Folder containing src/ (defaults to the model folder's parent)")
+    parser.add_argument('--explain-workers', type=int, default=2)
+    parser.add_argument('--max-wait-ms', type=float, default=1.0)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    args = parser.parse_args()
+
+    if not os.environ.get(AUTHKEY_ENV):
+        raise SystemExit(f"Set {AUTHKEY_ENV} to a shared secret before starting the inference service")
+    server = InferenceServer(
+        args.model, socket_path=args.socket, project_folder=args.project_folder,
+        explain_workers=args.explain_workers, max_wait_ms=args.max_wait_ms,
+        max_batch_size=args.max_batch_size,
+    )
+    print(f"Inference service listening on {args.socket}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
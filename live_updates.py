@@ -0,0 +1,62 @@
+"""
+LIVE MONITOR DELTAS
+Snapshots of the latest patient-hour and the minimal set of changed values
+"""
+
+import math
+
+# Display key -> (label, dataset column, decimals)
+LIVE_FIELDS = {
+    'risk': ("Risk %", None, 1),
+    'HR': ("Heart Rate", 'HR', 0),
+    'BP': ("Blood Pressure", None, 0),
+    'SpO2': ("Oxygen %", 'O2Sat', 0),
+    'Temp': ("Temp °C", 'Temp', 1),
+    'RR': ("Breathing", 'Resp', 0),
+    'NEWS2': ("NEWS2", None, 0),
+}
+
+
+def _rounded(value, decimals):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return round(float(value), decimals)
+
+
+def live_snapshot(hour, risk, row, news2):
+    """Values for the latest hour, rounded to display precision so that
+    changes invisible on screen are not pushed"""
+    snapshot = {'hour': int(hour)}
+    for key, (_, col, decimals) in LIVE_FIELDS.items():
+        if col is not None:
+            snapshot[key] = _rounded(row.get(col), decimals)
+    snapshot['risk'] = _rounded(risk, 1)
+    snapshot['NEWS2'] = _rounded(news2, 0)
+    sbp, dbp = _rounded(row.get('SBP'), 0), _rounded(row.get('DBP'), 0)
+    snapshot['BP'] = None if sbp is None else (sbp, dbp)
+    return snapshot
+
+
+def snapshot_delta(previous, current):
+    """{key: (value, change)} for every displayed value that differs from
+    ``previous``; change is None when there is no numeric difference to show"""
+    delta = {}
+    for key in LIVE_FIELDS:
+        value = current.get(key)
+        old = previous.get(key) if previous else None
+        if previous is not None and value == old:
+            continue
+        change = None
+        if isinstance(value, float) and isinstance(old, float):
+            change = round(value - old, LIVE_FIELDS[key][2])
+        delta[key] = (value, change)
+    return delta
+
+
+def format_live_value(key, value):
+    if value is None:
+        return "—"
+    if key == 'BP':
+        sbp, dbp = value
+        return f"{sbp:.0f}/{'—' if dbp is None else f'{dbp:.0f}'}"
+    return f"{value:.{LIVE_FIELDS[key][2]}f}"
@@ -0,0 +1,120 @@
+"""
+DYNAMIC MICRO-BATCHING
+Coalesces concurrent small predict_proba calls into one batched model call
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Collects requests for up to ``max_wait_ms`` or ``max_batch_size`` rows,
+    runs ``predict_fn`` once on the stacked rows and fans the results back out.
+
+    ``max_wait_ms`` trades latency for throughput: 0 only batches requests
+    that are already queued, larger values wait for more callers to join.
+    A request that would overflow ``max_batch_size`` waits for the next
+    batch (one larger than the limit runs alone). When a batch fails, each
+    of its requests is retried alone so only the offending caller sees the error.
+    """
+
+    def __init__(self, predict_fn, max_wait_ms=1.0, max_batch_size=128):
+        self.predict_fn = predict_fn
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.rows = 0
+        self._requests = queue.Queue()
+        self._carried = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+
+    def submit(self, X):
+        """Queue a 2-D block of rows; returns a Future for its slice of the output"""
+        self._ensure_started()
+        future = Future()
+        self._requests.put((np.asarray(X, dtype=float), future))
+        return future
+
+    def __call__(self, X):
+        return self.submit(X).result()
+
+    def _collect(self):
+        batch = [self._carried or self._requests.get()]
+        self._carried = None
+        n_rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait_s
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if n_rows + len(item[0]) > self.max_batch_size:
+                self._carried = item
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch, n_rows
+
+    def _run(self):
+        while True:
+            batch, n_rows = self._collect()
+            try:
+                X = batch[0][0] if len(batch) == 1 else np.vstack([X for X, _ in batch])
+                output = self.predict_fn(X)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    for item in batch:
+                        self._run_alone(*item)
+                continue
+
+            self.batches += 1
+            self.rows += n_rows
+            start = 0
+            for X, future in batch:
+                future.set_result(output[start:start + len(X)])
+                start += len(X)
+
+    def _run_alone(self, X, future):
+        try:
+            output = self.predict_fn(X)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(X)
+        future.set_result(output)
+
+    @property
+    def mean_batch_size(self):
+        return self.rows / self.batches if self.batches else 0.0
+
+
+class BatchedModel:
+    """Model wrapper whose predict_proba goes through a shared MicroBatcher"""
+
+    def __init__(self, model, max_wait_ms=1.0, max_batch_size=128):
+        self.model = model
+        self.batcher = MicroBatcher(model.predict_proba, max_wait_ms, max_batch_size)
+
+    def predict_proba(self, X):
+        return self.batcher(X)
+
+    def __getattr__(self, name):
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
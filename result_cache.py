@@ -0,0 +1,156 @@
+"""
+PERSISTENT RESULT CACHE
+SQLite-backed store for per-(patient, hour, model hash) results, shared by
+every dashboard worker process and surviving restarts
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    kind        TEXT    NOT NULL,
+    model_hash  TEXT    NOT NULL,
+    patient_id  INTEGER NOT NULL,
+    hour        INTEGER NOT NULL,
+    value       TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    last_access INTEGER NOT NULL,
+    PRIMARY KEY (kind, model_hash, patient_id, hour)
+);
+CREATE INDEX IF NOT EXISTS results_lru ON results (last_access);
+
+CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY CHECK (id = 0), total_bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO usage (id, total_bytes) VALUES (0, 0);
+
+CREATE TRIGGER IF NOT EXISTS results_ins AFTER INSERT ON results BEGIN
+    UPDATE usage SET total_bytes = total_bytes + new.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS results_del AFTER DELETE ON results BEGIN
+    UPDATE usage SET total_bytes = total_bytes - old.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS results_upd AFTER UPDATE OF size ON results BEGIN
+    UPDATE usage SET total_bytes = total_bytes + new.size - old.size WHERE id = 0;
+END;
+"""
+
+# Reads only refresh an entry's LRU timestamp when it is older than this
+TOUCH_INTERVAL_S = 60
+EVICT_BATCH = 256
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Short content hash used to key results by model version"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Cannot cache value of type {type(obj).__name__}")
+
+
+class ResultCache:
+    """Size-bounded LRU cache in a single SQLite file.
+
+    WAL mode lets any number of processes read while one writes; each thread
+    gets its own connection. Total stored bytes are kept in sync by triggers,
+    so eviction never has to scan the table.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, low_water=0.9):
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.low_water = low_water
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, kind, patient_id, hour, model_hash):
+        """Cached value or None"""
+        row = self._conn().execute(
+            "SELECT value, last_access FROM results "
+            "WHERE kind = ? AND model_hash = ? AND patient_id = ? AND hour = ?",
+            (kind, model_hash, int(patient_id), int(hour)),
+        ).fetchone()
+        if row is None:
+            return None
+        now = int(time.time())
+        if now - row[1] > TOUCH_INTERVAL_S:
+            self._conn().execute(
+                "UPDATE results SET last_access = ? "
+                "WHERE kind = ? AND model_hash = ? AND patient_id = ? AND hour = ?",
+                (now, kind, model_hash, int(patient_id), int(hour)),
+            )
+        return json.loads(row[0])
+
+    def put(self, kind, patient_id, hour, model_hash, value):
+        self.put_many(kind, model_hash, [(patient_id, hour, value)])
+
+    def put_many(self, kind, model_hash, items):
+        """Store (patient_id, hour, value) triples in one transaction"""
+        now = int(time.time())
+        rows = []
+        for patient_id, hour, value in items:
+            payload = json.dumps(value, default=_json_default)
+            rows.append((kind, model_hash, int(patient_id), int(hour), payload, len(payload), now))
+
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                "INSERT INTO results (kind, model_hash, patient_id, hour, value, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, model_hash, patient_id, hour) DO UPDATE SET "
+                "value = excluded.value, size = excluded.size, last_access = excluded.last_access",
+                rows,
+            )
+            self._evict(conn)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _evict(self, conn):
+        """Drop least recently used entries until under the low-water mark"""
+        if self.total_bytes(conn) <= self.max_bytes:
+            return
+        target = self.max_bytes * self.low_water
+        while self.total_bytes(conn) > target:
+            deleted = conn.execute(
+                "DELETE FROM results WHERE rowid IN "
+                "(SELECT rowid FROM results ORDER BY last_access LIMIT ?)",
+                (EVICT_BATCH,),
+            ).rowcount
+            if not deleted:
+                break
+
+    def total_bytes(self, conn=None):
+        conn = conn or self._conn()
+        return conn.execute("SELECT total_bytes FROM usage WHERE id = 0").fetchone()[0]
+
+    def purge_model(self, keep_hash):
+        """Remove results computed by any other model version"""
+        conn = self._conn()
+        conn.execute("DELETE FROM results WHERE model_hash != ?", (keep_hash,))
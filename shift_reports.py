@@ -0,0 +1,277 @@
+"""
+SHIFT HANDOVER REPORTS
+Per-patient risk trajectory, vitals, alerts and recommendations for every
+patient in the scored cohort, rendered in parallel and streamed to disk
+
+    python shift_reports.py --data data/processed/sepsis_features_final.parquet \\
+                            --model models/xgboost_sepsis.pkl --out reports/ --format pdf
+"""
+
+import argparse
+import csv
+import html
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+
+from backtest import alert_hours, policy, prepare_cohort
+from cohort_scoring import load_scored_cohort
+from time_series_store import add_store_arguments, store_from_args
+from treatment_rules import TreatmentRuleEngine
+
+SHIFT_HOURS = 12
+REPORT_VITALS = [('HR', 'Heart Rate', 'bpm'), ('SBP', 'Systolic BP', 'mmHg'), ('DBP', 'Diastolic BP', 'mmHg'),
+                 ('O2Sat', 'SpO2', '%'), ('Temp', 'Temperature', '°C'), ('Resp', 'Resp. Rate', '/min'),
+                 ('Lactate', 'Lactate', 'mmol/L')]
+SUMMARY_FIELDS = ['Patient_ID', 'from_hour', 'to_hour', 'risk_start', 'risk_end', 'risk_max',
+                  'news2_end', 'alerts', 'band', 'report']
+ALERT_POLICY = policy(60, name="dashboard DANGER (>=60%)")
+
+
+# ============================================================
+# PAYLOADS
+# ============================================================
+def iter_payloads(scored, shift_hours=SHIFT_HOURS, alert_policy=ALERT_POLICY):
+    """One small dict per patient covering the last ``shift_hours`` of their stay"""
+    fired = alert_hours(prepare_cohort(scored), alert_policy)
+    patient_ids = scored['Patient_ID'].to_numpy()
+    bounds = np.flatnonzero(np.r_[True, patient_ids[1:] != patient_ids[:-1], True])
+    latest_rows = scored.iloc[bounds[1:] - 1]
+    plans = TreatmentRuleEngine().recommend_batch(latest_rows['risk'].to_numpy(), latest_rows)
+
+    for start, end, plan in zip(bounds[:-1], bounds[1:], plans):
+        start = max(start, end - shift_hours)
+        shift = scored.iloc[start:end]
+        latest = shift.iloc[-1]
+        yield {
+            'patient_id': int(latest['Patient_ID']),
+            'hours': shift['Hour'].astype(int).tolist(),
+            'risk': shift['risk'].astype(float).round(1).tolist(),
+            'news2': shift['NEWS2'].astype(int).tolist() if 'NEWS2' in shift else [],
+            'alert_hours': shift['Hour'][fired[start:end]].astype(int).tolist(),
+            'vitals': {col: (None if col not in shift or np.isnan(latest[col]) else float(latest[col]))
+                       for col, _, _ in REPORT_VITALS},
+            'band': plan['band'],
+            'actions': list(plan['actions']),
+            'rationale': plan['rationale'],
+        }
+
+
+# ============================================================
+# RENDERING
+# ============================================================
+# Emoji and pictographs the PDF's standard fonts cannot draw
+_EMOJI = re.compile('[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D]+\\s*')
+_PDF_SIGNS = str.maketrans({'≥': '>=', '≤': '<=', '→': '->'})
+
+
+def _pdf_text(text):
+    """Markdown emphasis and emoji dropped, comparison signs spelled out for the PDF fonts"""
+    text = text.replace('**', '').translate(_PDF_SIGNS)
+    return _EMOJI.sub('', text).strip()
+
+
+def _html_text(text):
+    return re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', html.escape(text))
+
+
+def risk_svg(hours, risks, alerts=(), width=520, height=170):
+    """Lightweight SVG risk trajectory with the 20%/60% bands"""
+    pad = 30
+    span = max(hours[-1] - hours[0], 1)
+
+    def x(h):
+        return pad + (h - hours[0]) / span * (width - 2 * pad)
+
+    def y(r):
+        return height - pad - r / 100 * (height - 2 * pad)
+
+    parts = [f"<svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}' font-family='sans-serif' font-size='10'>"]
+    for lo, hi, color in ((0, 20, '#00c853'), (20, 60, '#ff9100'), (60, 100, '#ff1744')):
+        parts.append(f"<rect x='{pad}' y='{y(hi):.1f}' width='{width - 2 * pad}' height='{y(lo) - y(hi):.1f}' "
+                     f"fill='{color}' opacity='0.12'/>")
+    points = ' '.join(f"{x(h):.1f},{y(r):.1f}" for h, r in zip(hours, risks))
+    parts.append(f"<polyline points='{points}' fill='none' stroke='rgb(102,126,234)' stroke-width='3'/>")
+    for h in alerts:
+        parts.append(f"<line x1='{x(h):.1f}' x2='{x(h):.1f}' y1='{pad}' y2='{height - pad}' stroke='red' stroke-dasharray='4'/>")
+    parts.append(f"<text x='{pad}' y='{height - 8}'>Hour {hours[0]}</text>")
+    parts.append(f"<text x='{width - pad}' y='{height - 8}' text-anchor='end'>Hour {hours[-1]}</text>")
+    parts.append(f"<text x='4' y='{y(100) + 4:.1f}'>100%</text><text x='4' y='{y(0):.1f}'>0%</text>")
+    parts.append("</svg>")
+    return ''.join(parts)
+
+
+def _vital_rows(payload):
+    for col, label, unit in REPORT_VITALS:
+        value = payload['vitals'][col]
+        yield label, "—" if value is None else f"{value:.1f} {unit}"
+
+
+def render_html(payload, path):
+    rows = ''.join(f"<tr><td>{label}</td><td>{value}</td></tr>" for label, value in _vital_rows(payload))
+    actions = ''.join(f"<li>{_html_text(a)}</li>" for a in payload['actions'])
+    alerts = ', '.join(f"Hour {h}" for h in payload['alert_hours']) or 'None'
+    path.write_text(f"""<!DOCTYPE html>
+<html><head><meta charset='utf-8'><title>Patient #{payload['patient_id']} - Shift Summary</title>
+<style>body {{ font-family: sans-serif; margin: 2rem; }} td {{ padding: 0.2rem 1rem; }}</style></head>
+<body>
+<h2>Amrut Hospital ICU - Patient #{payload['patient_id']} - Shift Summary</h2>
+<p>Hours {payload['hours'][0]}-{payload['hours'][-1]} | Current risk: <b>{payload['risk'][-1]:.1f}% ({payload['band']})</b>
+ | Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+{risk_svg(payload['hours'], payload['risk'], payload['alert_hours'])}
+<h3>Latest Vitals</h3><table>{rows}</table>
+<h3>Alerts this shift</h3><p>{alerts}</p>
+<h3>Recommended Actions</h3><ol>{actions}</ol>
+<p><i>{_html_text(payload['rationale'])}</i></p>
+</body></html>
+""", encoding='utf-8')
+
+
+def _draw_wrapped(c, text, x, y, font, size, width, leading, indent=0):
+    """Draw text wrapped to ``width`` points from baseline y; returns the last baseline"""
+    c.setFont(font, size)
+    for i, line in enumerate(simpleSplit(text, font, size, width - indent)):
+        if i:
+            y -= leading
+        c.drawString(x + (indent if i else 0), y, line)
+    return y
+
+
+def render_pdf(payload, path):
+    page_w, page_h = A4
+    c = canvas.Canvas(str(path), pagesize=A4)
+    c.setFont('Helvetica-Bold', 15)
+    c.drawString(40, page_h - 50, f"Amrut Hospital ICU - Patient #{payload['patient_id']} - Shift Summary")
+    c.setFont('Helvetica', 10)
+    c.drawString(40, page_h - 68, f"Hours {payload['hours'][0]}-{payload['hours'][-1]} | Current risk: "
+                                  f"{payload['risk'][-1]:.1f}% ({payload['band']}) | "
+                                  f"Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+
+    # Risk trajectory with the 20%/60% bands
+    left, bottom, w, h = 40, page_h - 260, page_w - 80, 170
+    for lo, hi, rgb in ((0, 20, (0, .78, .33)), (20, 60, (1, .57, 0)), (60, 100, (1, .09, .27))):
+        c.setFillColorRGB(*rgb, alpha=0.12)
+        c.rect(left, bottom + lo / 100 * h, w, (hi - lo) / 100 * h, stroke=0, fill=1)
+    hours, risks = payload['hours'], payload['risk']
+    span = max(hours[-1] - hours[0], 1)
+    points = [(left + (hr - hours[0]) / span * w, bottom + r / 100 * h) for hr, r in zip(hours, risks)]
+    c.setStrokeColorRGB(.4, .49, .92)
+    c.setLineWidth(2.5)
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        c.line(x0, y0, x1, y1)
+    c.setStrokeColorRGB(1, 0, 0)
+    c.setLineWidth(1)
+    c.setDash(3, 3)
+    for hr in payload['alert_hours']:
+        ax = left + (hr - hours[0]) / span * w
+        c.line(ax, bottom, ax, bottom + h)
+    c.setDash()
+    c.setFillColorRGB(0, 0, 0)
+
+    y = bottom - 30
+    c.setFont('Helvetica-Bold', 12)
+    c.drawString(40, y, "Latest Vitals")
+    c.setFont('Helvetica', 10)
+    for label, value in _vital_rows(payload):
+        y -= 14
+        c.drawString(50, y, label)
+        c.drawString(180, y, value)
+
+    y -= 26
+    c.setFont('Helvetica-Bold', 12)
+    c.drawString(40, y, "Alerts this shift")
+    c.setFont('Helvetica', 10)
+    y -= 14
+    c.drawString(50, y, ', '.join(f"Hour {hr}" for hr in payload['alert_hours']) or 'None')
+
+    y -= 26
+    c.setFont('Helvetica-Bold', 12)
+    c.drawString(40, y, "Recommended Actions")
+    text_w = page_w - 90
+    for i, action in enumerate(payload['actions'], 1):
+        y = _draw_wrapped(c, f"{i}. {_pdf_text(action)}", 50, y - 14, 'Helvetica', 10, text_w, 12, indent=12)
+    _draw_wrapped(c, _pdf_text(payload['rationale']), 40, y - 20, 'Helvetica-Oblique', 9, page_w - 80, 11)
+    c.showPage()
+    c.save()
+
+
+RENDERERS = {'pdf': render_pdf, 'html': render_html}
+
+
+def render_report(payload, out_dir, fmt):
+    """Worker entry point: write one report, return its summary row"""
+    path = Path(out_dir) / f"patient_{payload['patient_id']}.{fmt}"
+    RENDERERS[fmt](payload, path)
+    risk = payload['risk']
+    return {
+        'Patient_ID': payload['patient_id'],
+        'from_hour': payload['hours'][0],
+        'to_hour': payload['hours'][-1],
+        'risk_start': risk[0],
+        'risk_end': risk[-1],
+        'risk_max': max(risk),
+        'news2_end': payload['news2'][-1] if payload['news2'] else '',
+        'alerts': len(payload['alert_hours']),
+        'band': payload['band'],
+        'report': path.name,
+    }
+
+
+def generate_reports(scored, out_dir, fmt='pdf', workers=None, shift_hours=SHIFT_HOURS, max_in_flight=None):
+    """Render every patient's report in parallel, streaming the summary CSV.
+
+    At most ``max_in_flight`` payloads are queued at once, so memory stays
+    flat however many patients the cohort holds. Returns the report count.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    count = 0
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 4 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(out_dir / 'shift_summary.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        pending = set()
+        for payload in iter_payloads(scored, shift_hours):
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    writer.writerow(future.result())
+                    count += 1
+            pending.add(pool.submit(render_report, payload, out_dir, fmt))
+        for future in pending:
+            writer.writerow(future.result())
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate per-patient shift handover reports")
+    add_store_arguments(parser)
+    parser.add_argument('--model', required=True)
+    parser.add_argument('--out', required=True, help="Output folder")
+    parser.add_argument('--format', choices=sorted(RENDERERS), default='pdf')
+    parser.add_argument('--shift-hours', type=int, default=SHIFT_HOURS)
+    parser.add_argument('--patients', type=int, nargs='*', help="Only these Patient_IDs")
+    parser.add_argument('--cache-dir', default=None, help="Reuse/store the scored cohort here")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    scored = load_scored_cohort(store_from_args(args), args.model, args.cache_dir)
+    if args.patients:
+        scored = scored[scored['Patient_ID'].isin(args.patients)].reset_index(drop=True)
+    started = datetime.now()
+    count = generate_reports(scored, args.out, args.format, args.workers, args.shift_hours)
+    print(f"{count} reports written to {args.out} in {(datetime.now() - started).total_seconds():.1f}s")
+
+
+if __name__ == '__main__':
+    main()
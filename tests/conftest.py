@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Dashboard modules live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class ConstantModel:
+    """Picklable stand-in for the XGBoost model: risk rises with the first feature"""
+
+    def predict_proba(self, X):
+        p = 1 / (1 + np.exp(-np.asarray(X, dtype=float)[:, 0] / 50))
+        return np.column_stack([1 - p, p])
+
+
+@pytest.fixture
+def scored_cohort():
+    """Synthetic scored cohort: 40 patients with stays of 5-44 hours"""
+    def build(n_patients=40, seed=0):
+        rng = np.random.default_rng(seed)
+        frames = []
+        for patient_id in range(n_patients):
+            n_hours = 5 + patient_id
+            frames.append(pd.DataFrame({
+                'Patient_ID': patient_id,
+                'Hour': np.arange(n_hours),
+                'SepsisLabel': (np.arange(n_hours) >= n_hours - 3) & (patient_id % 4 == 0),
+                'HR': rng.normal(90, 15, n_hours),
+                'O2Sat': rng.normal(96, 2, n_hours),
+                'Temp': rng.normal(37.2, 0.6, n_hours),
+                'SBP': rng.normal(115, 15, n_hours),
+                'DBP': rng.normal(70, 10, n_hours),
+                'Resp': rng.normal(18, 4, n_hours),
+                'Lactate': np.nan,
+                'risk': rng.uniform(0, 100, n_hours),
+                'NEWS2': rng.integers(0, 10, n_hours),
+            }))
+        return pd.concat(frames, ignore_index=True)
+    return build
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import alert_hours, evaluate_policy, policy, prepare_cohort, run_backtest
+
+POLICIES = [policy(50), policy(30, 2), policy(30, 3), policy(20, 2, repeat_hours=3),
+            policy(40, 1, repeat_hours=1), policy(30, 1, min_news2=5)]
+
+
+def brute_force_alerts(scored, pol):
+    """Hour-by-hour replay, one patient at a time"""
+    fired = []
+    for _, stay in scored.groupby('Patient_ID', sort=False):
+        run = 0
+        for risk, news2 in zip(stay['risk'], stay['NEWS2']):
+            run = run + 1 if risk >= pol.threshold and news2 >= pol.min_news2 else 0
+            if pol.repeat_hours:
+                fired.append(run >= pol.persist_hours and (run - pol.persist_hours) % pol.repeat_hours == 0)
+            else:
+                fired.append(run == pol.persist_hours)
+    return np.array(fired)
+
+
+def brute_force_metrics(scored, pol, max_lead_hours):
+    fired = brute_force_alerts(scored, pol)
+    leads, timely, false_alarm, n_septic, n_clean = [], 0, 0, 0, 0
+    for _, stay in scored.assign(fired=fired).groupby('Patient_ID', sort=False):
+        alerts = stay.loc[stay['fired'], 'Hour'].tolist()
+        if not stay['SepsisLabel'].any():
+            n_clean += 1
+            false_alarm += bool(alerts)
+            continue
+        n_septic += 1
+        onset = stay.loc[stay['SepsisLabel'].astype(bool), 'Hour'].min()
+        in_window = [h for h in alerts if onset - max_lead_hours <= h <= onset]
+        timely += len(in_window)
+        if in_window:
+            leads.append(onset - min(in_window))
+    return {
+        'sensitivity': len(leads) / n_septic,
+        'false_alarm_patients': false_alarm / n_clean,
+        'alert_ppv': timely / fired.sum() if fired.sum() else np.nan,
+        'median_lead_h': float(np.median(leads)) if leads else np.nan,
+        'alerts': int(fired.sum()),
+    }
+
+
+def test_run_length_resets_between_patients():
+    scored = pd.DataFrame({'Patient_ID': [1, 1, 1, 2, 2, 2, 2],
+                           'Hour': [0, 1, 2, 0, 1, 2, 3],
+                           'risk': [90, 90, 90, 90, 10, 90, 90],
+                           'NEWS2': 0})
+    cohort = prepare_cohort(scored)
+
+    # Patient 1's run must not carry over into patient 2's first hour
+    assert alert_hours(cohort, policy(50, 2)).tolist() == [False, True, False, False, False, False, True]
+    assert alert_hours(cohort, policy(50, 1, repeat_hours=1)).tolist() == [True, True, True, True, False, True, True]
+    assert alert_hours(cohort, policy(50, 1)).tolist() == [True, False, False, True, False, True, False]
+
+
+@pytest.mark.parametrize('pol', POLICIES, ids=lambda p: p.name)
+def test_alert_hours_match_an_hourly_replay(scored_cohort, pol):
+    scored = scored_cohort()
+    np.testing.assert_array_equal(alert_hours(prepare_cohort(scored), pol), brute_force_alerts(scored, pol))
+
+
+@pytest.mark.parametrize('pol', POLICIES, ids=lambda p: p.name)
+def test_metrics_match_an_hourly_replay(scored_cohort, pol):
+    scored = scored_cohort(seed=3)
+    result = evaluate_policy(pol, prepare_cohort(scored, max_lead_hours=10))
+    expected = brute_force_metrics(scored, pol, max_lead_hours=10)
+
+    for key, value in expected.items():
+        np.testing.assert_allclose(result[key], value, err_msg=key)
+
+
+def test_parallel_and_serial_backtests_agree(scored_cohort):
+    scored = scored_cohort()
+    serial = run_backtest(scored, POLICIES, workers=1)
+    parallel = run_backtest(scored, POLICIES, workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import numpy as np
+
+from cache_budget import CacheBudget
+
+MB = 2**20
+
+
+def block(mb):
+    return np.zeros(int(mb * MB), dtype=np.uint8)
+
+
+def test_evicts_least_recently_used_by_bytes():
+    budget = CacheBudget(10 * MB)
+    for key in 'abc':
+        budget.put('predictions', key, block(3))
+    budget.get('predictions', 'a')
+    budget.put('figures', 'd', block(3))
+
+    assert budget.get('predictions', 'b') is None
+    assert budget.get('predictions', 'a') is not None
+    assert budget.total_bytes == 9 * MB
+    stats = budget.stats().set_index('namespace')
+    assert stats.loc['predictions', 'evictions'] == 1
+    assert stats.loc['predictions', 'hits'] == 2
+
+
+def test_pinned_dataset_is_kept_even_over_budget():
+    budget = CacheBudget(10 * MB)
+    budget.put('predictions', 'x', block(4))
+    budget.put('data', ('dataset', 1), block(12), pin=True)
+
+    assert budget.over_budget
+    assert budget.get('data', ('dataset', 1)) is not None
+    assert budget.get('predictions', 'x') is None
+    assert not budget.put('predictions', 'y', block(1))
+
+    budget.discard('data', lambda key: key[1] != 2)
+    assert budget.total_bytes == budget.pinned_bytes == 0
+    assert budget.put('predictions', 'y', block(1))
+
+
+def test_concurrent_misses_compute_once():
+    budget = CacheBudget(10 * MB)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return block(1)
+
+    threads = [threading.Thread(target=budget.get_or_compute, args=('data', 'dataset', load)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+
+def test_slow_compute_does_not_block_other_keys():
+    budget = CacheBudget(10 * MB)
+    release = threading.Event()
+    slow = threading.Thread(target=budget.get_or_compute,
+                            args=('explanations', 'slow', lambda: release.wait(5) and block(1)))
+    slow.start()
+    try:
+        started = time.perf_counter()
+        for i in range(100):
+            budget.get_or_compute('data', ('dataset', i), lambda: block(0.01))
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+        slow.join()
+    assert budget.get('explanations', 'slow') is not None
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from clinical_scores import CARRY_FORWARD_HOURS, NEWS2_BAND_UNKNOWN, compute_clinical_scores
+
+NORMAL = {'HR': 70.0, 'Resp': 16.0, 'Temp': 37.0, 'SBP': 120.0, 'O2Sat': 98.0}
+
+
+def score_one(**values):
+    row = pd.DataFrame([{'Patient_ID': 1, 'Hour': 0, **NORMAL, **values}])
+    return compute_clinical_scores(row).iloc[0]
+
+
+NEWS2_EDGES = [
+    ('Resp', 8, 3), ('Resp', 9, 1), ('Resp', 11, 1), ('Resp', 12, 0), ('Resp', 20, 0),
+    ('Resp', 21, 2), ('Resp', 24, 2), ('Resp', 25, 3),
+    ('O2Sat', 91, 3), ('O2Sat', 92, 2), ('O2Sat', 93, 2), ('O2Sat', 94, 1), ('O2Sat', 95, 1), ('O2Sat', 96, 0),
+    ('SBP', 90, 3), ('SBP', 91, 2), ('SBP', 100, 2), ('SBP', 101, 1), ('SBP', 110, 1), ('SBP', 111, 0),
+    ('SBP', 219, 0), ('SBP', 220, 3),
+    ('HR', 40, 3), ('HR', 41, 1), ('HR', 50, 1), ('HR', 51, 0), ('HR', 90, 0), ('HR', 91, 1),
+    ('HR', 110, 1), ('HR', 111, 2), ('HR', 130, 2), ('HR', 131, 3),
+    ('Temp', 35.0, 3), ('Temp', 35.1, 1), ('Temp', 36.0, 1), ('Temp', 36.1, 0), ('Temp', 38.0, 0),
+    ('Temp', 38.1, 1), ('Temp', 39.0, 1), ('Temp', 39.1, 2),
+    ('FiO2', 0.21, 0), ('FiO2', 0.22, 2), ('FiO2', 21, 0), ('FiO2', 28, 2),
+]
+
+
+@pytest.mark.parametrize('col, value, points', NEWS2_EDGES)
+def test_news2_parameter_band_edges(col, value, points):
+    scores = score_one(**{col: value})
+    assert scores['NEWS2'] == points
+    assert scores['NEWS2_band'] == (1 if points == 3 else 0)
+
+
+@pytest.mark.parametrize('values, band', [
+    ({'HR': 91, 'Temp': 38.1, 'O2Sat': 94, 'SBP': 101}, 0),   # 4, no single 3
+    ({'HR': 111, 'Temp': 38.1, 'O2Sat': 94, 'SBP': 101}, 1),  # 5
+    ({'HR': 111, 'Temp': 39.1, 'O2Sat': 94, 'SBP': 101}, 1),  # 6
+    ({'HR': 111, 'Temp': 39.1, 'O2Sat': 92, 'SBP': 101}, 2),  # 7
+    ({'Resp': 25}, 1),                                        # 3 in one parameter
+])
+def test_news2_clinical_risk_bands(values, band):
+    assert score_one(**values)['NEWS2_band'] == band
+
+
+@pytest.mark.parametrize('values, sirs', [
+    ({'Temp': 38.0}, 0), ({'Temp': 38.1}, 1), ({'Temp': 36.0}, 0), ({'Temp': 35.9}, 1),
+    ({'HR': 90}, 0), ({'HR': 91}, 1),
+    ({'Resp': 20}, 0), ({'Resp': 21}, 1), ({'PaCO2': 32}, 0), ({'PaCO2': 31.9}, 1), ({'Resp': 21, 'PaCO2': 30}, 1),
+    ({'WBC': 12}, 0), ({'WBC': 12.1}, 1), ({'WBC': 4}, 0), ({'WBC': 3.9}, 1),
+    ({'Temp': 39, 'HR': 120, 'Resp': 30, 'WBC': 20}, 4),
+])
+def test_sirs_criteria_edges(values, sirs):
+    assert score_one(**values)['SIRS'] == sirs
+
+
+@pytest.mark.parametrize('values, qsofa', [
+    ({'Resp': 21}, 0), ({'Resp': 22}, 1), ({'SBP': 101}, 0), ({'SBP': 100}, 1), ({'Resp': 22, 'SBP': 100}, 2),
+])
+def test_qsofa_criteria_edges(values, qsofa):
+    assert score_one(**values)['qSOFA'] == qsofa
+
+
+def test_readings_are_carried_forward_only_within_their_limit():
+    def first_only(value):
+        return [value] + [np.nan] * 30
+
+    stay = pd.DataFrame({'Patient_ID': 1, 'Hour': np.arange(31), 'HR': first_only(95.0), 'Resp': first_only(22.0),
+                         'SBP': first_only(95.0), 'FiO2': first_only(0.5), 'WBC': first_only(15.0)})
+    scores = compute_clinical_scores(stay)
+
+    vital_limit = CARRY_FORWARD_HOURS['HR']
+    fresh, stale = scores.loc[vital_limit], scores.loc[vital_limit + 1]
+    assert fresh['qSOFA'] == 2 and fresh['NEWS2'] == 7 and fresh['NEWS2_band'] == 2
+    assert stale['qSOFA'] == 0 and stale['NEWS2'] == 0 and stale['NEWS2_band'] == NEWS2_BAND_UNKNOWN
+    # Labs are kept longer than vitals, then dropped too
+    assert stale['SIRS'] == 1
+    assert scores.loc[CARRY_FORWARD_HOURS['WBC'] + 1, 'SIRS'] == 0
+    assert (scores.loc[30] == [0, 0, 0, NEWS2_BAND_UNKNOWN]).all()
+
+
+def test_limit_counts_hours_not_rows_and_stays_within_a_patient():
+    frame = pd.DataFrame({'Patient_ID': [1, 1, 2], 'Hour': [0, 10, 0],
+                          'HR': [135.0, np.nan, np.nan], 'Resp': [16.0, np.nan, np.nan],
+                          'SBP': [120.0, np.nan, np.nan]})
+    scores = compute_clinical_scores(frame)
+
+    assert scores['NEWS2'].tolist() == [3, 0, 0]
+    assert scores['NEWS2_band'].tolist() == [1, NEWS2_BAND_UNKNOWN, NEWS2_BAND_UNKNOWN]
+
+
+def test_nothing_recorded_is_not_low_risk():
+    frame = pd.DataFrame({'Patient_ID': [1, 1], 'Hour': [0, 1], 'HR': [np.nan, 70.0], 'Resp': [np.nan, 16.0]})
+    assert (compute_clinical_scores(frame)['NEWS2_band'] == NEWS2_BAND_UNKNOWN).all()
+    # An abnormal reading still raises the band when other vitals are missing
+    assert score_one(HR=135.0, Resp=np.nan, Temp=np.nan, SBP=np.nan, O2Sat=np.nan)['NEWS2_band'] == 1
@@ -0,0 +1,31 @@
+import joblib
+import numpy as np
+import pandas as pd
+
+from cohort_scoring import load_scored_cohort
+from conftest import ConstantModel
+from time_series_store import open_store
+
+
+def raw_hours(patient_ids, hour_range):
+    rows = [{'Patient_ID': p, 'Hour': h, 'HR': 80.0 + h, 'SBP': 120.0, 'Resp': 16.0, 'SepsisLabel': 0}
+            for p in patient_ids for h in hour_range]
+    return pd.DataFrame(rows)
+
+
+def test_scored_cohort_cache_follows_the_store_version(tmp_path):
+    model_path = tmp_path / 'model.pkl'
+    joblib.dump(ConstantModel(), model_path)
+    store = open_store('partitioned', tmp_path / 'store')
+    store.append(raw_hours(range(3), range(4)))
+
+    first = load_scored_cohort(store, model_path, tmp_path / 'cache')
+    assert len(first) == 12
+    assert len(load_scored_cohort(store, model_path, tmp_path / 'cache')) == 12
+
+    store.append(raw_hours([0], range(4, 6)))
+    second = load_scored_cohort(store, model_path, tmp_path / 'cache')
+    assert len(second) == 14
+    assert second.loc[second['Patient_ID'] == 0, 'Hour'].tolist() == list(range(6))
+    assert len(list((tmp_path / 'cache').glob('scored_cohort_*.parquet'))) == 1
+    assert np.isfinite(second['risk']).all()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from drift_monitor import TDigest
+
+QUANTILES = [0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999]
+
+
+def digest_of(values, **kwargs):
+    digest = TDigest(**kwargs)
+    for v in values:
+        digest.add(v)
+    return digest
+
+
+@pytest.mark.parametrize('order', ['shuffled', 'ascending', 'descending'])
+@pytest.mark.parametrize('dist', ['normal', 'lognormal'])
+def test_quantiles_are_within_a_rank_tolerance(dist, order):
+    rng = np.random.default_rng(0)
+    values = rng.normal(80, 15, 50_000) if dist == 'normal' else rng.lognormal(0, 1.5, 50_000)
+    if order != 'shuffled':
+        values = np.sort(values)[::1 if order == 'ascending' else -1]
+    digest = digest_of(values)
+    ordered = np.sort(values)
+
+    for q in QUANTILES:
+        rank = np.searchsorted(ordered, digest.quantile(q)) / len(values)
+        # The k1 scale keeps tail centroids small, so the tails are held to a tighter rank error
+        assert abs(rank - q) <= (0.001 if min(q, 1 - q) <= 0.01 else 0.005), q
+
+
+def test_memory_is_bounded_by_compression():
+    digest = digest_of(np.random.default_rng(1).uniform(size=100_000), compression=100)
+    digest.quantile(0.5)
+
+    assert digest.count == 100_000
+    assert len(digest.means) <= 100 + 1
+
+
+def test_small_and_empty_digests():
+    assert np.isnan(TDigest().quantile(0.5))
+    assert TDigest().count == 0
+    assert digest_of([7.0]).quantile(0.9) == 7.0
+    few = digest_of([1.0, 2.0, 3.0])
+    assert few.count == 3 and few.quantile(0.0) == 1.0 and few.quantile(1.0) == 3.0
@@ -0,0 +1,60 @@
+import threading
+import time
+from multiprocessing import AuthenticationError
+
+import joblib
+import numpy as np
+import pytest
+
+from conftest import ConstantModel
+from inference_service import AUTHKEY_ENV, InferenceClient, InferenceServer
+from result_cache import file_hash
+
+
+def start_service(tmp_path, explain_workers=0):
+    model_path = tmp_path / 'model.pkl'
+    joblib.dump(ConstantModel(), model_path)
+    socket_path = str(tmp_path / 'inference.sock')
+    server = InferenceServer(model_path, socket_path, authkey=b'secret', explain_workers=explain_workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for _ in range(100):
+        if (tmp_path / 'inference.sock').exists():
+            break
+        time.sleep(0.01)
+    return socket_path, model_path
+
+
+@pytest.fixture
+def service(tmp_path):
+    return start_service(tmp_path)
+
+
+def test_client_scores_and_reports_the_service_model_hash(service):
+    socket_path, model_path = service
+    client = InferenceClient(socket_path, authkey=b'secret')
+    assert client.ping()
+    assert client.model_hash() == file_hash(model_path)
+    X = np.array([[0.0], [100.0]])
+    np.testing.assert_allclose(client.predict_proba(X), ConstantModel().predict_proba(X))
+
+
+def test_wrong_authkey_is_rejected(service):
+    socket_path, _ = service
+    with pytest.raises(AuthenticationError):
+        InferenceClient(socket_path, authkey=b'guess').ping()
+
+
+def test_authkey_is_required(monkeypatch):
+    monkeypatch.delenv(AUTHKEY_ENV, raising=False)
+    with pytest.raises(RuntimeError, match=AUTHKEY_ENV):
+        InferenceClient('/nonexistent.sock')
+
+
+def test_explain_workers_are_spawned_after_the_batcher_has_run(tmp_path):
+    socket_path, _ = start_service(tmp_path, explain_workers=1)
+    client = InferenceClient(socket_path, authkey=b'secret')
+    client.predict_proba(np.zeros((1, 1)))
+
+    # No SHAP explainer in the test tree: the spawned worker starts and answers with an error
+    with pytest.raises(RuntimeError, match="explainer is not available"):
+        client.explain_patient(np.zeros((1, 1)), ['Bias'])
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from live_updates import LIVE_FIELDS, format_live_value, live_snapshot, snapshot_delta
+
+ROW = pd.Series({'HR': 88.4, 'SBP': 121.0, 'DBP': 79.6, 'O2Sat': 97.0, 'Temp': 37.04, 'Resp': 16.0})
+
+
+def test_first_snapshot_sends_every_field_without_changes():
+    snapshot = live_snapshot(3, 41.26, ROW, 2)
+    delta = snapshot_delta(None, snapshot)
+
+    assert set(delta) == set(LIVE_FIELDS)
+    assert all(change is None for _, change in delta.values())
+    assert delta['risk'] == (41.3, None) and delta['BP'] == ((121.0, 80.0), None)
+
+
+def test_only_changed_values_are_sent():
+    before = live_snapshot(3, 41.26, ROW, 2)
+    # Changes below display precision are not changes
+    after = live_snapshot(4, 41.33, pd.Series({**ROW, 'HR': 92.0, 'Temp': 37.01}), 2)
+
+    assert snapshot_delta(before, after) == {'HR': (92.0, 4.0)}
+    assert snapshot_delta(after, after) == {}
+
+
+def test_values_that_go_missing_are_sent_without_a_change():
+    before = live_snapshot(3, 41.3, ROW, 2)
+    after = live_snapshot(4, 41.3, pd.Series({**ROW, 'HR': np.nan, 'SBP': np.nan}), None)
+
+    assert snapshot_delta(before, after) == {'HR': (None, None), 'BP': (None, None), 'NEWS2': (None, None)}
+    assert snapshot_delta(after, before)['HR'] == (88.0, None)
+
+
+def test_blood_pressure_with_a_missing_diastolic():
+    snapshot = live_snapshot(3, 41.3, ROW.drop('DBP'), 2)
+
+    assert snapshot['BP'] == (121.0, None)
+    assert format_live_value('BP', snapshot['BP']) == "121/—"
+    assert format_live_value('BP', None) == "—"
+    assert format_live_value('Temp', 37.0) == "37.0"
@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from micro_batching import BatchedModel, MicroBatcher
+
+
+class GatedModel:
+    """Doubles its input; the first call blocks until released so later requests queue up"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.batch_sizes = []
+
+    def predict_proba(self, X):
+        self.started.set()
+        self.release.wait(timeout=5)
+        if X.shape[1] != 2:
+            raise ValueError(f"expected 2 features, got {X.shape[1]}")
+        if np.isnan(X).any():
+            raise ValueError("NaN in input")
+        self.batch_sizes.append(len(X))
+        return X * 2
+
+
+def queue_behind_first(batcher, model, blocks):
+    """Submit a first request, wait until it is running, then queue ``blocks``"""
+    first = batcher.submit(np.zeros((1, 2)))
+    model.started.wait(timeout=5)
+    futures = [batcher.submit(X) for X in blocks]
+    model.release.set()
+    return first, futures
+
+
+def test_each_caller_gets_its_own_slice_under_concurrency():
+    model = GatedModel()
+    model.release.set()
+    batched = BatchedModel(model, max_wait_ms=2.0, max_batch_size=64)
+
+    def call(i):
+        X = np.full((1 + i % 3, 2), float(i))
+        return X, batched.predict_proba(X)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(call, range(200)))
+
+    for X, output in results:
+        np.testing.assert_array_equal(output, X * 2)
+    assert batched.batcher.mean_batch_size > 1
+
+
+def test_batches_never_exceed_max_batch_size():
+    model = GatedModel()
+    batcher = MicroBatcher(model.predict_proba, max_wait_ms=20.0, max_batch_size=8)
+    blocks = [np.full((3, 2), float(i)) for i in range(10)] + [np.ones((20, 2))]
+    first, futures = queue_behind_first(batcher, model, blocks)
+
+    for X, future in zip(blocks, futures):
+        np.testing.assert_array_equal(future.result(timeout=5), X * 2)
+    # Whole requests only: pairs of 3-row blocks, and the oversized one alone
+    assert model.batch_sizes[1:] == [6, 6, 6, 6, 6, 20]
+    assert batcher.rows == 1 + 30 + 20
+
+
+def test_a_failing_request_only_fails_its_own_caller():
+    model = GatedModel()
+    batcher = MicroBatcher(model.predict_proba, max_wait_ms=20.0, max_batch_size=64)
+    good, bad, wrong_width = np.ones((2, 2)), np.array([[np.nan, 1.0]]), np.ones((1, 3))
+    first, (good_f, bad_f, width_f, good_again_f) = queue_behind_first(
+        batcher, model, [good, bad, wrong_width, good * 3]
+    )
+
+    np.testing.assert_array_equal(good_f.result(timeout=5), good * 2)
+    np.testing.assert_array_equal(good_again_f.result(timeout=5), good * 6)
+    with pytest.raises(ValueError, match="NaN"):
+        bad_f.result(timeout=5)
+    with pytest.raises(ValueError, match="expected 2 features"):
+        width_f.result(timeout=5)
+    first.result(timeout=5)
@@ -0,0 +1,73 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import result_cache
+from result_cache import ResultCache
+
+
+def stored_bytes(cache):
+    return cache._conn().execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+
+def test_values_round_trip_with_numpy_types(tmp_path):
+    cache = ResultCache(tmp_path / 'results.sqlite')
+    cache.put('trend', np.int64(3), np.int64(4), 'm1', [np.float32(1.5), np.arange(2)])
+
+    assert cache.get('trend', 3, 4, 'm1') == [1.5, [0, 1]]
+    assert cache.get('trend', 3, 4, 'm2') is None
+    with pytest.raises(TypeError):
+        cache.put('shap', 3, 4, 'm1', {'frame': object()})
+
+
+def test_usage_total_follows_inserts_upserts_and_deletes(tmp_path):
+    cache = ResultCache(tmp_path / 'results.sqlite')
+    cache.put_many('trend', 'm1', [(p, 0, [0.5] * p) for p in range(1, 6)])
+    cache.put_many('trend', 'm1', [(p, 0, [0.25] * (10 - p)) for p in range(1, 4)])
+    cache.put('trend', 1, 0, 'm1', 'x')
+    assert cache.total_bytes() == stored_bytes(cache)
+
+    cache.put('trend', 1, 0, 'm2', [1.0])
+    cache.purge_model('m2')
+    assert cache.total_bytes() == stored_bytes(cache) == len(json.dumps([1.0]))
+
+
+def test_lru_eviction_down_to_the_low_water_mark(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'EVICT_BATCH', 1)
+    payload = 'x' * 98                    # 100 bytes once JSON-encoded
+    cache = ResultCache(tmp_path / 'results.sqlite', max_bytes=1000, low_water=0.5)
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(result_cache.time, 'time', lambda: next(clock))
+
+    cache.put_many('shap', 'm1', [(p, 0, payload) for p in range(10)])
+    assert cache.total_bytes() == 1000
+    # Reading patient 0 makes it the most recently used entry
+    monkeypatch.setattr(result_cache.time, 'time', lambda: 5000)
+    assert cache.get('shap', 0, 0, 'm1') == payload
+
+    monkeypatch.setattr(result_cache.time, 'time', lambda: 5001)
+    cache.put('shap', 10, 0, 'm1', payload)
+    assert cache.total_bytes() == stored_bytes(cache) == 500
+    kept = sorted(r[0] for r in cache._conn().execute("SELECT patient_id FROM results"))
+    assert kept == [0, 7, 8, 9, 10]
+
+
+def test_writes_are_visible_to_another_process(tmp_path):
+    path = tmp_path / 'results.sqlite'
+    cache = ResultCache(path)
+    cache.put('trend', 1, 0, 'm1', [0.1])
+
+    script = (
+        "from result_cache import ResultCache\n"
+        f"cache = ResultCache({str(path)!r})\n"
+        "assert cache.get('trend', 1, 0, 'm1') == [0.1]\n"
+        "cache.put('trend', 2, 0, 'm1', [0.2])\n"
+    )
+    subprocess.run([sys.executable, '-c', script], check=True, cwd=Path(__file__).resolve().parent.parent)
+
+    assert cache.get('trend', 2, 0, 'm1') == [0.2]
+    assert cache.total_bytes() == stored_bytes(cache)
@@ -0,0 +1,49 @@
+import csv
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+
+from shift_reports import _html_text, _pdf_text, generate_reports, iter_payloads, render_pdf
+from treatment_rules import BAND_LOW, N_FLAGS, TreatmentRuleEngine
+
+
+def test_pdf_text_keeps_comparison_meaning_and_drops_emoji():
+    assert _pdf_text("🚨 **Lactate ≥ 2 mmol/L.** ⏰ SpO2 ≤ 92%") == "Lactate >= 2 mmol/L. SpO2 <= 92%"
+
+
+def test_html_text_keeps_unicode_and_renders_emphasis():
+    assert _html_text("💉 **Lactate ≥ 2** & <recheck>") == "💉 <b>Lactate ≥ 2</b> &amp; &lt;recheck&gt;"
+
+
+def test_generate_reports_writes_one_report_and_summary_row_per_patient(tmp_path, scored_cohort):
+    scored = scored_cohort(n_patients=6)
+    assert generate_reports(scored, tmp_path, fmt='html', workers=2, max_in_flight=2) == 6
+
+    with open(tmp_path / 'shift_summary.csv', newline='', encoding='utf-8') as f:
+        summary = list(csv.DictReader(f))
+    assert sorted(int(row['Patient_ID']) for row in summary) == list(range(6))
+    assert all((tmp_path / row['report']).exists() for row in summary)
+    assert all(int(row['to_hour']) - int(row['from_hour']) == min(11, 4 + int(row['Patient_ID'])) for row in summary)
+
+
+def test_pdf_wraps_long_rationale_and_actions_without_cutting_words(tmp_path, scored_cohort, monkeypatch):
+    engine = TreatmentRuleEngine()
+    rationale = engine.plan(int(engine.signature(BAND_LOW, (1 << N_FLAGS) - 1)))['rationale']
+    action = "Start broad-spectrum antibiotics within 1 hour " * 4
+    payload = {**next(iter_payloads(scored_cohort(n_patients=1))), 'rationale': rationale, 'actions': [action]}
+    drawn = []
+    monkeypatch.setattr(Canvas, 'drawString',
+                        lambda self, x, y, text, *a, **k: drawn.append((x, self._fontname, text)))
+
+    render_pdf(payload, tmp_path / 'report.pdf')
+
+    texts = [text for _, _, text in drawn]
+    start = texts.index("Recommended Actions") + 1
+    rationale_at = next(i for i, (_, font, _) in enumerate(drawn) if font == 'Helvetica-Oblique')
+    action_lines, rationale_lines = texts[start:rationale_at], texts[rationale_at:]
+    assert len(action_lines) > 1 and ' '.join(action_lines).split() == f"1. {action}".split()
+    assert len(rationale_lines) > 1 and ' '.join(rationale_lines) == _pdf_text(rationale)
+    assert rationale_lines[-1].endswith("Lactate >= 2 mmol/L.")
+    for x, font, text in drawn[start:]:
+        assert x + stringWidth(text, font, 9 if font == 'Helvetica-Oblique' else 10) <= A4[0] - 40
@@ -0,0 +1,125 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from time_series_store import PartitionedParquetStore, migrate, open_store, read_versioned
+
+
+def hours(patient_ids, hour_range):
+    return pd.DataFrame([
+        {'Patient_ID': p, 'Hour': h, 'HR': 60.0 + p + h} for p in patient_ids for h in hour_range
+    ])
+
+
+@pytest.fixture(params=['partitioned', 'duckdb'])
+def store(request, tmp_path):
+    if request.param == 'duckdb':
+        pytest.importorskip('duckdb')
+        return open_store('duckdb', tmp_path / 'store.duckdb')
+    return open_store('partitioned', tmp_path / 'store')
+
+
+def test_append_bumps_version_and_reads_back_sorted(store):
+    version = store.version()
+    store.append(hours([3, 1, 2], range(4, 8)).sample(frac=1, random_state=0))
+    store.append(hours([1], range(8, 10)))
+    assert store.version() > version
+
+    frame = store.read()
+    assert len(frame) == 14
+    assert frame[['Patient_ID', 'Hour']].equals(frame[['Patient_ID', 'Hour']].sort_values(['Patient_ID', 'Hour']))
+
+
+def test_read_by_patient_and_hour_range(store):
+    store.append(hours(range(10), range(24)))
+    frame = store.read(patient_ids=[np.int64(7)], hour_from=np.int64(5), hour_to=8)
+    assert frame['Patient_ID'].unique().tolist() == [7]
+    assert frame['Hour'].tolist() == [5, 6, 7, 8]
+
+
+def test_partitioned_compact_merges_parts_without_changing_rows(tmp_path):
+    store = PartitionedParquetStore(tmp_path / 'store', buckets=4)
+    for h in range(5):
+        store.append(hours(range(8), [h]))
+    before = store.read()
+    assert len(list((tmp_path / 'store').glob('bucket=*/day=*/part-*.parquet'))) == 20
+
+    version = store.version()
+    assert store.compact() == 20
+    assert len(list((tmp_path / 'store').glob('bucket=*/day=*/part-*.parquet'))) == 4
+    assert store.version() > version
+    pd.testing.assert_frame_equal(store.read(), before)
+    assert store.compact() == 0
+
+
+def test_partitioned_append_casts_to_the_stored_schema(tmp_path):
+    store = PartitionedParquetStore(tmp_path / 'store')
+    store.append(hours([1], range(3)))
+    late = hours([2], range(2)).assign(HR=70)
+    store.append(late)
+    assert store.read()['HR'].dtype == np.float64
+
+
+def test_migrate_copies_the_monolithic_file(tmp_path):
+    source = tmp_path / 'data.parquet'
+    hours(range(30), range(10)).to_parquet(source, index=False)
+    store = open_store('partitioned', tmp_path / 'store')
+    assert migrate(source, store, batch_rows=70) == 300
+    assert len(store.read()) == 300
+    assert len(list((tmp_path / 'store').glob('bucket=*/day=*/part-*.parquet'))) <= 30
+
+
+def test_read_only_stores_refuse_writes(tmp_path):
+    open_store('partitioned', tmp_path / 'store').append(hours([1], range(2)))
+    reader = open_store('partitioned', tmp_path / 'store', read_only=True)
+    assert len(reader.read(patient_ids=[1])) == 2
+    with pytest.raises(PermissionError):
+        reader.append(hours([1], [2]))
+
+
+def test_duckdb_appends_from_another_process_while_a_reader_is_open(tmp_path):
+    pytest.importorskip('duckdb')
+    path = tmp_path / 'store.duckdb'
+    open_store('duckdb', path).append(hours([1], range(2)))
+    reader = open_store('duckdb', path, read_only=True)
+    version = reader.version()
+
+    script = (
+        "import pandas as pd; from time_series_store import open_store; "
+        f"open_store('duckdb', {str(path)!r}).append(pd.DataFrame({{'Patient_ID': [1], 'Hour': [2], 'HR': [70.0]}}))"
+    )
+    subprocess.run([sys.executable, '-c', script], check=True, cwd=Path(__file__).resolve().parent.parent)
+    assert reader.version() > version
+    assert reader.read(patient_ids=[1])['Hour'].tolist() == [0, 1, 2]
+
+
+class AppendDuringFirstRead:
+    """Store whose version moves while the first read is in flight"""
+
+    def __init__(self):
+        self.appends = 0
+
+    def version(self):
+        return self.appends
+
+    def read(self, **filters):
+        rows = pd.DataFrame({'Hour': range(self.appends + 1)})
+        if self.appends == 0:
+            self.appends += 1
+        return rows
+
+
+def test_read_versioned_returns_the_version_it_read():
+    version, frame = read_versioned(AppendDuringFirstRead())
+    assert version == 1 and len(frame) == 2
+
+
+def test_read_versioned_against_a_store(tmp_path):
+    store = open_store('partitioned', tmp_path / 'store')
+    store.append(pd.DataFrame({'Patient_ID': [1, 2], 'Hour': [0, 0], 'HR': [80.0, 90.0]}))
+    version, frame = read_versioned(store, patient_ids=[2])
+    assert version == store.version() and frame['HR'].tolist() == [90.0]
@@ -0,0 +1,60 @@
+import numpy as np
+
+from treatment_rules import (BAND_NAMES, BP_ABNORMAL, N_FLAGS, PROTOCOL_RULES, TreatmentRuleEngine,
+                             signature_flags)
+
+MISSING = {key: np.nan for key in ('HR', 'SBP', 'DBP', 'SpO2', 'Temp', 'RR', 'Lactate')}
+
+
+def test_missing_vitals_raise_no_flags():
+    assert signature_flags(*[np.nan] * 7)[0] == 0
+
+
+def test_unrecorded_vitals_do_not_trigger_vital_steps():
+    engine = TreatmentRuleEngine()
+
+    high = engine.recommend(80, MISSING)
+    assert 'vasopressors' not in high['steps']
+    medium = engine.recommend(40, MISSING)
+    assert 'fluid_bolus' not in medium['steps'] and 'oxygen_support' not in medium['steps']
+    low = engine.recommend(5, MISSING)
+    assert 'recheck_vitals' not in low['steps']
+
+    shocked = engine.recommend(80, {**MISSING, 'SBP': 85.0, 'Lactate': 4.0})
+    assert 'vasopressors' in shocked['steps']
+    assert signature_flags(np.nan, 85.0, np.nan, np.nan, np.nan, np.nan)[0] == BP_ABNORMAL
+
+
+def rule_applies(r, band, flags):
+    """Direct reading of a rule's definition for one signature"""
+    return (band in r.bands
+            and flags & r.all_flags == r.all_flags
+            and (not r.any_flags or flags & r.any_flags)
+            and not flags & r.none_flags)
+
+
+def test_compiled_index_matches_each_rule_evaluated_directly():
+    engine = TreatmentRuleEngine()
+    for band in BAND_NAMES:
+        for flags in range(1 << N_FLAGS):
+            sig = int(engine.signature(band, flags))
+            expected = [rule_applies(r, band, flags) for r in PROTOCOL_RULES]
+            assert engine._rule_matrix[sig].tolist() == expected, (band, flags)
+            assert engine.plan(sig)['steps'] == tuple(r.step for r, hit in zip(PROTOCOL_RULES, expected) if hit)
+
+
+def test_batch_lookups_agree_with_single_recommendations(scored_cohort):
+    engine = TreatmentRuleEngine()
+    frame = scored_cohort().assign(SIRS=lambda f: f['Patient_ID'] % 4, qSOFA=lambda f: f['Hour'] % 3,
+                                   NEWS2_band=lambda f: f['NEWS2'] // 4)
+    risk = frame['risk'].to_numpy()
+    batch = engine.recommend_batch(risk, frame)
+    needs = engine.needs('antibiotics_1h', risk, frame)
+
+    for i in range(0, len(frame), 7):
+        row = frame.iloc[i]
+        vitals = {'HR': row['HR'], 'SBP': row['SBP'], 'DBP': row['DBP'], 'SpO2': row['O2Sat'],
+                  'Temp': row['Temp'], 'RR': row['Resp'], 'Lactate': row['Lactate']}
+        single = engine.recommend(risk[i], vitals, row[['SIRS', 'qSOFA', 'NEWS2_band']].to_dict())
+        assert batch[i] == single
+        assert needs[i] == ('antibiotics_1h' in single['steps'])
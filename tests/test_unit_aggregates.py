@@ -0,0 +1,84 @@
+import sqlite3
+
+import pandas as pd
+
+from conftest import ConstantModel
+from unit_aggregates import UnitAggregateStore, backfill, update
+
+END_UNIT_HOUR = 500_000
+
+
+def test_backfill_aligns_every_stay_to_end_at_the_latest_hour(tmp_path, scored_cohort):
+    scored = scored_cohort()
+    store = UnitAggregateStore(tmp_path / 'unit.sqlite')
+    backfill(store, scored, end_unit_hour=END_UNIT_HOUR)
+
+    hourly = store.series('hour', 24, END_UNIT_HOUR)
+    assert hourly['n'].iloc[-1] == scored['Patient_ID'].nunique()
+    assert hourly['n'].sum() == (scored['Hour'] >= scored.groupby('Patient_ID')['Hour'].transform('max') - 23).sum()
+    assert store.latest_unit_hour() == END_UNIT_HOUR
+
+
+def test_backfill_counts_each_patient_hour_once(tmp_path, scored_cohort):
+    scored = scored_cohort()
+    store = UnitAggregateStore(tmp_path / 'unit.sqlite')
+    assert backfill(store, scored, end_unit_hour=END_UNIT_HOUR) == len(scored)
+    assert backfill(store, scored, end_unit_hour=END_UNIT_HOUR) == 0
+    assert store.series('day', 3, END_UNIT_HOUR)['n'].sum() == len(scored)
+
+
+class CountingModel(ConstantModel):
+    """ConstantModel that remembers how many rows it scored"""
+
+    def __init__(self):
+        self.rows_scored = 0
+
+    def predict_proba(self, X):
+        self.rows_scored += len(X)
+        return super().predict_proba(X)
+
+
+def raw_stay(patient_id, hours, bias):
+    return pd.DataFrame({'Patient_ID': patient_id, 'Hour': list(hours), 'Bias': bias, 'HR': 80.0, 'SBP': 120.0})
+
+
+def test_update_scores_only_unrecorded_hours(tmp_path):
+    store = UnitAggregateStore(tmp_path / 'unit.sqlite')
+    model = CountingModel()
+    first = pd.concat([raw_stay(1, range(3), -100.0), raw_stay(2, range(2), -100.0)])
+    assert update(store, first, model, end_unit_hour=END_UNIT_HOUR) == 5
+
+    # Patient 1 gets two more hours: only those are scored, and the rise into the danger band alerts once
+    appended = pd.concat([first, raw_stay(1, [3, 4], 100.0)])
+    assert update(store, appended, model, end_unit_hour=END_UNIT_HOUR + 2) == 2
+    assert model.rows_scored == 7
+    assert update(store, appended, model, end_unit_hour=END_UNIT_HOUR + 2) == 0
+
+    hourly = store.series('hour', 24, END_UNIT_HOUR + 2)
+    assert hourly['n'].sum() == 7 and hourly['alerts'].sum() == 1
+    assert hourly.loc[END_UNIT_HOUR + 1, 'alerts'] == 1
+    assert store.recorded()['risk'].notna().all()
+
+
+def test_update_continues_a_backfilled_stay(tmp_path, scored_cohort):
+    scored = scored_cohort(n_patients=4)
+    store = UnitAggregateStore(tmp_path / 'unit.sqlite')
+    backfill(store, scored, end_unit_hour=END_UNIT_HOUR)
+
+    data = scored.drop(columns=['risk', 'NEWS2', 'SepsisLabel'])
+    extra = data[data['Patient_ID'] == 0].tail(1).assign(Hour=lambda f: f['Hour'] + 1)
+    assert update(store, pd.concat([data, extra]), CountingModel(), end_unit_hour=END_UNIT_HOUR + 1) == 1
+    assert store.series('hour', 1, END_UNIT_HOUR + 1)['n'].item() == 1
+
+
+def test_stores_without_risks_are_migrated(tmp_path):
+    path = tmp_path / 'unit.sqlite'
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE scored (patient_id INTEGER NOT NULL, hour INTEGER NOT NULL, "
+                     "PRIMARY KEY (patient_id, hour)) WITHOUT ROWID")
+        conn.execute("INSERT INTO scored VALUES (1, 0)")
+    conn.close()
+
+    store = UnitAggregateStore(path)
+    assert update(store, raw_stay(1, range(2), 100.0), CountingModel(), end_unit_hour=END_UNIT_HOUR) == 1
+    assert store.recorded()['risk'].isna().tolist() == [True, False]
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ConstantModel
+from treatment_rules import TreatmentRuleEngine
+from what_if import run_what_if
+
+FEATURES = ['Bias', 'HR', 'SBP', 'DBP', 'O2Sat', 'Temp', 'Resp']
+
+
+def test_antibiotics_rule_sees_the_scores_of_each_scenario():
+    # Bias -20 puts ConstantModel at ~40% risk, the medium band
+    base = pd.DataFrame([{'Patient_ID': 1, 'Hour': 5, 'Bias': -20.0, 'HR': 85.0, 'SBP': 120.0, 'DBP': 75.0,
+                          'O2Sat': 97.0, 'Temp': 37.0, 'Resp': 16.0}])
+    results, _ = run_what_if(ConstantModel(), base, FEATURES, {'SBP': [0, -35], 'Resp': [0, 14]},
+                             treatment_engine=TreatmentRuleEngine())
+
+    assert (results['band'] == 'MEDIUM').all()
+    shocked = (results['SBP'] == -35) & (results['Resp'] == 14)
+    assert results.loc[shocked, 'antibiotics_1h'].all()
+    assert not results.loc[(results['SBP'] == 0) & (results['Resp'] == 0), 'antibiotics_1h'].any()
+
+
+def test_unchanged_scenario_scores_the_row_as_the_dashboard_does():
+    # Lactate is the model's leading feature here and was never recorded
+    features = ['Lactate', 'HR', 'SBP']
+    base = pd.DataFrame([{'Patient_ID': 1, 'Hour': 5, 'Lactate': np.nan, 'HR': 85.0, 'SBP': np.nan}])
+    model = ConstantModel()
+    results, _ = run_what_if(model, base, features, {'Lactate': [0, 2, 4], 'SBP': [0, -30]})
+
+    expected = model.predict_proba(base[features].fillna(0).to_numpy())[0, 1] * 100
+    unchanged = (results['Lactate'] == 0) & (results['SBP'] == 0)
+    assert results.loc[unchanged, 'risk'].item() == pytest.approx(expected)
+    # Perturbed scenarios start from the normal value instead
+    raised = results.loc[(results['Lactate'] == 2) & (results['SBP'] == 0), 'risk'].item()
+    assert raised == pytest.approx(model.predict_proba(np.array([[1.0 + 2, 85.0, 0.0]]))[0, 1] * 100)
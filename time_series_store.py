@@ -0,0 +1,382 @@
+"""
+TIME-SERIES STORAGE
+Append-only patient-hour storage behind load_data(), with reads by
+Patient_ID and hour range that do not touch the rest of the dataset
+
+    python time_series_store.py migrate --source data/processed/sepsis_features_final.parquet \\
+                                        --backend partitioned --target data/store
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+DEFAULT_BUCKETS = 64
+ROW_GROUP_SIZE = 64_000
+KEY_COLS = ['Patient_ID', 'Hour']
+# How long a DuckDB call waits for another process's conflicting lock
+LOCK_TIMEOUT_S = 10
+LOCK_RETRY_S = 0.05
+
+
+def _filters(patient_ids=None, hour_from=None, hour_to=None):
+    """pyarrow row filters for a patient / hour-range read (None = no filter)"""
+    filters = []
+    if patient_ids is not None:
+        filters.append(('Patient_ID', 'in', [int(p) for p in patient_ids]))
+    if hour_from is not None:
+        filters.append(('Hour', '>=', hour_from))
+    if hour_to is not None:
+        filters.append(('Hour', '<=', hour_to))
+    return filters or None
+
+
+def _write_parquet(table, path):
+    """Write next to ``path`` under a dot-name, then rename into place"""
+    tmp = path.with_name('.' + path.name)
+    pq.write_table(table, tmp, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp, path)
+
+
+# ============================================================
+# SINGLE FILE (legacy layout)
+# ============================================================
+class ParquetFileStore:
+    """The original monolithic parquet file.
+
+    Reads push the Patient_ID/Hour filters down to row groups, but every
+    append rewrites the whole file - migrate to ``partitioned`` or ``duckdb``
+    for deployments that keep adding hours.
+    """
+
+    def __init__(self, path, read_only=False):
+        self.path = Path(path)
+        self.read_only = read_only
+
+    def version(self):
+        return self.path.stat().st_mtime_ns
+
+    def read(self, patient_ids=None, hour_from=None, hour_to=None, columns=None):
+        return pd.read_parquet(self.path, columns=columns, filters=_filters(patient_ids, hour_from, hour_to))
+
+    def append(self, rows):
+        if self.read_only:
+            raise PermissionError(f"{self.path} is open read-only")
+        existing = pd.read_parquet(self.path) if self.path.exists() else None
+        combined = pd.concat([existing, rows], ignore_index=True) if existing is not None else rows
+        _write_parquet(pa.Table.from_pandas(combined, preserve_index=False), self.path)
+        return len(rows)
+
+
+# ============================================================
+# PARTITIONED PARQUET
+# ============================================================
+class PartitionedParquetStore:
+    """Append-only parquet parts under ``bucket=NN/day=YYYY-MM-DD/``.
+
+    Patients are hashed into a fixed number of buckets, so a per-patient
+    read opens one bucket's parts only; each part is sorted by Patient_ID
+    and Hour, so row-group statistics skip the other patients and hours.
+    The day partition is the UTC date the hours were appended. ``compact()``
+    merges the small parts that live appends leave behind.
+    """
+
+    def __init__(self, root, buckets=None, read_only=False):
+        self.root = Path(root)
+        self.read_only = read_only
+        meta = self._meta()
+        if not meta:
+            if read_only:
+                raise FileNotFoundError(f"No partitioned store at {self.root}")
+            self.root.mkdir(parents=True, exist_ok=True)
+            meta = {'buckets': buckets or DEFAULT_BUCKETS, 'version': 0}
+            self._save_meta(meta)
+        self.buckets = meta['buckets']
+
+    # Metadata and schema live under '_' names, which dataset scans skip
+    def _meta(self):
+        path = self.root / '_store.json'
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def _save_meta(self, meta):
+        tmp = self.root / '._store.json'
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.root / '_store.json')
+
+    def _bump_version(self):
+        meta = self._meta()
+        meta['version'] += 1
+        self._save_meta(meta)
+
+    def _schema(self, rows):
+        path = self.root / '_schema.parquet'
+        if path.exists():
+            return pq.read_schema(path)
+        schema = pa.Table.from_pandas(rows.iloc[:0], preserve_index=False).schema.remove_metadata()
+        pq.write_table(schema.empty_table(), path)
+        return schema
+
+    def _parts(self, buckets=None):
+        dirs = [self.root / f"bucket={b:02d}" for b in buckets] if buckets is not None else \
+            sorted(self.root.glob('bucket=*'))
+        return sorted(str(p) for d in dirs for p in d.glob('day=*/part-*.parquet'))
+
+    def version(self):
+        return self._meta()['version']
+
+    def append(self, rows):
+        """Write new patient-hours as one part per touched bucket"""
+        if self.read_only:
+            raise PermissionError(f"{self.root} is open read-only")
+        if not len(rows):
+            return 0
+        schema = self._schema(rows)
+        rows = rows.reindex(columns=schema.names).sort_values(KEY_COLS, kind='stable')
+        day = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        stamp = time.time_ns()
+        for bucket, part in rows.groupby(rows['Patient_ID'].astype('int64') % self.buckets):
+            folder = self.root / f"bucket={bucket:02d}" / f"day={day}"
+            folder.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+            _write_parquet(table, folder / f"part-{stamp}.parquet")
+        self._bump_version()
+        return len(rows)
+
+    def read(self, patient_ids=None, hour_from=None, hour_to=None, columns=None):
+        buckets = None
+        if patient_ids is not None:
+            buckets = sorted({int(p) % self.buckets for p in patient_ids})
+        parts = self._parts(buckets)
+        if not parts:
+            return pd.DataFrame(columns=columns or pq.read_schema(self.root / '_schema.parquet').names)
+        try:
+            table = pq.read_table(parts, columns=columns, filters=_filters(patient_ids, hour_from, hour_to),
+                                  schema=pq.read_schema(self.root / '_schema.parquet'))
+        except FileNotFoundError:
+            # A compaction replaced the parts while we listed them
+            return self.read(patient_ids, hour_from, hour_to, columns)
+        frame = table.to_pandas()
+        sort_cols = [c for c in KEY_COLS if c in frame.columns]
+        return frame.sort_values(sort_cols, kind='stable').reset_index(drop=True) if sort_cols else frame
+
+    def compact(self):
+        """Merge each bucket/day's parts into one sorted file; run while appends are paused"""
+        if self.read_only:
+            raise PermissionError(f"{self.root} is open read-only")
+        schema = pq.read_schema(self.root / '_schema.parquet')
+        merged = 0
+        for folder in sorted(self.root.glob('bucket=*/day=*')):
+            parts = sorted(folder.glob('part-*.parquet'))
+            if len(parts) < 2:
+                continue
+            table = pq.read_table([str(p) for p in parts], schema=schema)
+            table = table.sort_by([(c, 'ascending') for c in KEY_COLS])
+            _write_parquet(table, folder / f"part-{time.time_ns()}.parquet")
+            for part in parts:
+                part.unlink()
+            merged += len(parts)
+        if merged:
+            self._bump_version()
+        return merged
+
+
+# ============================================================
+# DUCKDB
+# ============================================================
+class DuckDBStore:
+    """Local DuckDB table indexed on (Patient_ID, Hour).
+
+    DuckDB lets one process hold a file read-write, or many hold it
+    read-only, so every call opens a short-lived connection and retries
+    while another process holds a conflicting lock. Dashboards open the
+    store with ``read_only=True``; the ``append`` CLI can then add hours
+    between their reads.
+    """
+
+    def __init__(self, path, read_only=False):
+        if duckdb is None:
+            raise ImportError("The 'duckdb' storage backend needs the duckdb package (pip install duckdb)")
+        self.path = Path(path)
+        self.read_only = read_only
+        if read_only:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS store_meta (version BIGINT)")
+            if conn.execute("SELECT COUNT(*) FROM store_meta").fetchone()[0] == 0:
+                conn.execute("INSERT INTO store_meta VALUES (0)")
+
+    @contextmanager
+    def _conn(self):
+        deadline = time.monotonic() + LOCK_TIMEOUT_S
+        while True:
+            try:
+                conn = duckdb.connect(str(self.path), read_only=self.read_only)
+                break
+            except duckdb.IOException as e:
+                if 'lock' not in str(e).lower() or time.monotonic() > deadline:
+                    raise
+                time.sleep(LOCK_RETRY_S)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _has_table(self, conn):
+        return conn.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'vitals'"
+        ).fetchone()[0] > 0
+
+    def version(self):
+        with self._conn() as conn:
+            return conn.execute("SELECT version FROM store_meta").fetchone()[0]
+
+    def append(self, rows):
+        if self.read_only:
+            raise PermissionError(f"{self.path} is open read-only")
+        if not len(rows):
+            return 0
+        with self._conn() as conn:
+            conn.register('incoming', rows)
+            conn.execute('BEGIN TRANSACTION')
+            try:
+                if self._has_table(conn):
+                    conn.execute("INSERT INTO vitals BY NAME SELECT * FROM incoming")
+                else:
+                    conn.execute("CREATE TABLE vitals AS SELECT * FROM incoming")
+                    conn.execute("CREATE INDEX vitals_patient_hour ON vitals (Patient_ID, Hour)")
+                conn.execute("UPDATE store_meta SET version = version + 1")
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return len(rows)
+
+    def read(self, patient_ids=None, hour_from=None, hour_to=None, columns=None):
+        select = ', '.join(f'"{c}"' for c in columns) if columns else '*'
+        where, params = [], []
+        if patient_ids is not None:
+            # DuckDB cannot bind numpy scalars
+            patient_ids = [int(p) for p in patient_ids]
+            where.append(f"Patient_ID IN ({', '.join('?' for _ in patient_ids)})")
+            params.extend(patient_ids)
+        if hour_from is not None:
+            where.append("Hour >= ?")
+            params.append(int(hour_from))
+        if hour_to is not None:
+            where.append("Hour <= ?")
+            params.append(int(hour_to))
+        sql = f"SELECT {select} FROM vitals"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if not columns or set(KEY_COLS) <= set(columns):
+            sql += " ORDER BY Patient_ID, Hour"
+        with self._conn() as conn:
+            if not self._has_table(conn):
+                return pd.DataFrame(columns=columns)
+            return conn.execute(sql, params).df()
+
+
+STORE_BACKENDS = {
+    'parquet': ParquetFileStore,
+    'partitioned': PartitionedParquetStore,
+    'duckdb': DuckDBStore,
+}
+
+
+def open_store(backend, path, read_only=False):
+    """Store for a backend name; readers such as the dashboard pass ``read_only=True``"""
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Unknown storage backend {backend!r}; expected one of {sorted(STORE_BACKENDS)}")
+    return STORE_BACKENDS[backend](path, read_only=read_only)
+
+
+def read_versioned(store, **filters):
+    """(version, frame) read with no append landing in between, retrying until one does not"""
+    while True:
+        version = store.version()
+        frame = store.read(**filters)
+        if store.version() == version:
+            return version, frame
+
+
+def store_id(store):
+    """Short identifier of a store's backend and location, for cache file names"""
+    location = Path(getattr(store, 'root', None) or store.path).resolve()
+    return hashlib.sha256(f"{type(store).__name__}:{location}".encode()).hexdigest()[:12]
+
+
+def add_store_arguments(parser):
+    """--data/--backend options shared by the batch CLIs"""
+    parser.add_argument('--data', required=True, help="Dataset parquet file, or store path for --backend")
+    parser.add_argument('--backend', choices=sorted(STORE_BACKENDS), default='parquet',
+                        help="Storage backend of --data (default: the single parquet file)")
+
+
+def store_from_args(args):
+    return open_store(args.backend, args.data, read_only=True)
+
+
+def migrate(source, store, batch_rows=500_000):
+    """Stream a monolithic parquet file into ``store`` in row batches"""
+    copied = 0
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=batch_rows):
+        copied += store.append(batch.to_pandas())
+    if hasattr(store, 'compact'):
+        store.compact()
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the patient-hour time-series store")
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('migrate', "Copy the existing parquet file into a new store"),
+                            ('append', "Append new patient-hours from a parquet file")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument('--source', required=True)
+        cmd.add_argument('--backend', choices=sorted(STORE_BACKENDS), required=True)
+        cmd.add_argument('--target', required=True, help="Store folder (partitioned) or database file (duckdb)")
+    cmd = sub.add_parser('compact', help="Merge the small parts left by appends")
+    cmd.add_argument('--target', required=True)
+    args = parser.parse_args()
+
+    if args.command == 'compact':
+        print(f"Merged {PartitionedParquetStore(args.target).compact()} parts in {args.target}")
+        return
+
+    target = Path(args.target)
+    if args.command == 'migrate' and target.exists():
+        raise SystemExit(f"{target} already exists; migrate writes a new store")
+    store = open_store(args.backend, target)
+    started = time.perf_counter()
+    if args.command == 'migrate':
+        try:
+            copied = migrate(args.source, store)
+        except BaseException:
+            if target.is_dir():
+                shutil.rmtree(target, ignore_errors=True)
+            else:
+                target.unlink(missing_ok=True)
+            raise
+    else:
+        copied = store.append(pd.read_parquet(args.source))
+    print(f"{copied} rows written to {target} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
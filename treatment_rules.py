@@ -0,0 +1,236 @@
+"""
+RULE-INDEXED TREATMENT RECOMMENDATIONS
+Risk band + abnormal-vital flags + clinical scores -> protocol steps
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# ============================================================
+# RISK BANDS
+# ============================================================
+RISK_BAND_EDGES = (20, 60)
+BAND_LOW, BAND_MEDIUM, BAND_HIGH = 0, 1, 2
+BAND_NAMES = {BAND_LOW: 'LOW', BAND_MEDIUM: 'MEDIUM', BAND_HIGH: 'HIGH'}
+
+
+def risk_bands(risk_percent):
+    """Vectorized 20%/60% banding used throughout the dashboard"""
+    return np.digitize(np.asarray(risk_percent, dtype=float), RISK_BAND_EDGES).astype(np.int8)
+
+
+# ============================================================
+# SIGNATURE FLAGS
+# ============================================================
+HR_ABNORMAL = 1 << 0
+TEMP_ABNORMAL = 1 << 1
+BP_ABNORMAL = 1 << 2
+RR_ABNORMAL = 1 << 3
+SPO2_LOW = 1 << 4
+LACTATE_HIGH = 1 << 5
+SIRS_POSITIVE = 1 << 6
+QSOFA_POSITIVE = 1 << 7
+NEWS2_ELEVATED = 1 << 8
+NEWS2_HIGH = 1 << 9
+N_FLAGS = 10
+
+VITAL_FLAGS = HR_ABNORMAL | TEMP_ABNORMAL | BP_ABNORMAL | RR_ABNORMAL | SPO2_LOW
+
+
+def _as_array(values):
+    return np.atleast_1d(np.asarray(values, dtype=float))
+
+
+def signature_flags(hr, sbp, dbp, spo2, temp, rr, lactate=np.nan,
+                    sirs=0, qsofa=0, news2_band=0):
+    """Vectorized flag mask; thresholds match the vital cards, missing values are not flagged"""
+    hr, sbp, dbp, spo2, temp, rr, lactate = (
+        _as_array(v) for v in (hr, sbp, dbp, spo2, temp, rr, lactate)
+    )
+    sirs, qsofa, news2_band = (_as_array(v) for v in (sirs, qsofa, news2_band))
+
+    with np.errstate(invalid='ignore'):
+        flags = (
+            np.where((hr < 60) | (hr > 100), HR_ABNORMAL, 0)
+            | np.where((temp < 36.5) | (temp > 37.5), TEMP_ABNORMAL, 0)
+            | np.where((sbp < 90) | (sbp > 140) | (dbp < 60) | (dbp > 90), BP_ABNORMAL, 0)
+            | np.where((rr < 12) | (rr > 20), RR_ABNORMAL, 0)
+            | np.where(spo2 < 92, SPO2_LOW, 0)
+            | np.where(lactate >= 2, LACTATE_HIGH, 0)
+            | np.where(sirs >= 2, SIRS_POSITIVE, 0)
+            | np.where(qsofa >= 2, QSOFA_POSITIVE, 0)
+            | np.where(news2_band >= 1, NEWS2_ELEVATED, 0)
+            | np.where(news2_band >= 2, NEWS2_HIGH, 0)
+        )
+    return flags.astype(np.int32)
+
+
+# ============================================================
+# PROTOCOL RULES
+# ============================================================
+Rule = namedtuple('Rule', 'step text bands all_flags any_flags none_flags')
+
+
+def rule(step, text, bands, all_flags=0, any_flags=0, none_flags=0):
+    return Rule(step, text, frozenset(bands), all_flags, any_flags, none_flags)
+
+
+LOW = (BAND_LOW,)
+MEDIUM = (BAND_MEDIUM,)
+HIGH = (BAND_HIGH,)
+
+# Listed in the order they are shown to staff
+PROTOCOL_RULES = (
+    # Low risk - routine care
+    rule('monitor_4h', "Continue standard monitoring every 4 hours", LOW, none_flags=NEWS2_ELEVATED),
+    rule('monitor_1h_news2', "📞 NEWS2 elevated - inform nurse in charge and move to hourly observations",
+         LOW, any_flags=NEWS2_ELEVATED),
+    rule('recheck_vitals', "🔄 Recheck abnormal vital signs within 1 hour", LOW, any_flags=VITAL_FLAGS),
+    rule('maintain_plan', "Maintain current treatment plan", LOW),
+    rule('record_vitals', "Record vital signs regularly", LOW),
+    rule('normal_activity', "Patient can have normal activities as tolerated", LOW, none_flags=VITAL_FLAGS),
+    rule('no_intervention', "No immediate intervention required", LOW, none_flags=VITAL_FLAGS | NEWS2_ELEVATED),
+    rule('continue_meds', "Continue prescribed medications as ordered", LOW),
+
+    # Medium risk - enhanced monitoring
+    rule('monitor_1_2h', "🔄 Increase monitoring frequency to every 1-2 hours", MEDIUM),
+    rule('check_labs', "📊 Check lab values: lactate, WBC count, creatinine", MEDIUM),
+    rule('sepsis_screen', "🩺 Sepsis screen positive - draw blood cultures and lactate now",
+         MEDIUM, any_flags=SIRS_POSITIVE | QSOFA_POSITIVE),
+    rule('iv_access', "💉 Ensure IV access is functional and patent", MEDIUM),
+    rule('alert_physician', "📞 Alert attending physician of patient status", MEDIUM),
+    rule('antibiotics_1h', "💊 **Start broad-spectrum antibiotics within 1 hour**",
+         MEDIUM, any_flags=QSOFA_POSITIVE | NEWS2_HIGH),
+    rule('consider_antibiotics', "💊 Consider starting/adjusting antibiotics if infection suspected",
+         MEDIUM, none_flags=QSOFA_POSITIVE | NEWS2_HIGH),
+    rule('fluid_bolus', "💧 Give 500mL crystalloid bolus and reassess blood pressure",
+         MEDIUM, all_flags=BP_ABNORMAL),
+    rule('fluid_balance', "💧 Monitor fluid balance and urine output closely", MEDIUM),
+    rule('oxygen_support', "🫁 Start supplemental oxygen (target SpO2 > 92%)", MEDIUM, all_flags=SPO2_LOW),
+    rule('reassess_1h', "⏰ Reassess patient condition in 1 hour", MEDIUM),
+    rule('document', "📋 Document all changes in patient status", MEDIUM),
+
+    # High risk - sepsis protocol
+    rule('notify_physician', "🚨 **IMMEDIATE physician notification required**", HIGH),
+    rule('continuous_monitoring', "📡 Initiate continuous vital signs monitoring", HIGH),
+    rule('stat_labs', "🩺 Obtain STAT labs: blood cultures, lactate, CBC, metabolic panel", HIGH),
+    rule('central_access', "💉 Ensure adequate IV access (consider central line placement)", HIGH),
+    rule('fluid_resuscitation', "💧 Begin aggressive fluid resuscitation (30mL/kg crystalloid)", HIGH),
+    rule('vasopressors', "💉 Start vasopressors if MAP remains < 65 mmHg after fluids",
+         HIGH, all_flags=BP_ABNORMAL | LACTATE_HIGH),
+    rule('antibiotics_1h', "💊 **Start broad-spectrum antibiotics within 1 hour**", HIGH),
+    rule('escalate_care', "🏥 Consider ICU transfer or escalation of care level", HIGH),
+    rule('oxygen_support', "🫁 Provide oxygen support as needed (target SpO2 > 92%)", HIGH),
+    rule('rapid_response', "📞 Notify rapid response team immediately", HIGH),
+    rule('airway', "⚡ Prepare for possible intubation if respiratory distress", HIGH),
+)
+
+RATIONALE = {
+    BAND_LOW: "All vitals within normal range. Patient is stable and showing no signs of deterioration.",
+    BAND_MEDIUM: "Patient showing early signs of clinical deterioration. Closer observation and possible intervention needed to prevent worsening.",
+    BAND_HIGH: "**CRITICAL**: Patient at high risk of sepsis or severe deterioration. Immediate intervention required per sepsis protocol.",
+}
+
+FLAG_REASONS = (
+    (VITAL_FLAGS, "Abnormal vital signs on the monitor."),
+    (SIRS_POSITIVE, "SIRS criteria met."),
+    (QSOFA_POSITIVE, "qSOFA positive."),
+    (NEWS2_ELEVATED, "NEWS2 above the routine-care range."),
+    (LACTATE_HIGH, "Lactate ≥ 2 mmol/L."),
+)
+
+
+# ============================================================
+# ENGINE
+# ============================================================
+class TreatmentRuleEngine:
+    """Serves protocol steps from a rule index compiled once per rule set.
+
+    Every (risk band, flag mask) signature is resolved up front into a
+    boolean step matrix, so single lookups and ward-wide batch queries are
+    plain array indexing. Rendered plans are memoized per signature.
+    """
+
+    def __init__(self, rules=PROTOCOL_RULES):
+        self.rules = tuple(rules)
+        self.steps = tuple(dict.fromkeys(r.step for r in self.rules))
+        self._step_col = {step: i for i, step in enumerate(self.steps)}
+        self._rule_matrix = self._compile()
+        self._step_matrix = np.zeros((len(self._rule_matrix), len(self.steps)), dtype=bool)
+        for r_idx, r in enumerate(self.rules):
+            self._step_matrix[:, self._step_col[r.step]] |= self._rule_matrix[:, r_idx]
+        self.plan = lru_cache(maxsize=None)(self._build_plan)
+
+    def _compile(self):
+        """Evaluate every rule against every possible signature"""
+        masks = np.arange(1 << N_FLAGS)
+        n_sig = len(BAND_NAMES) << N_FLAGS
+        matrix = np.zeros((n_sig, len(self.rules)), dtype=bool)
+        for band in BAND_NAMES:
+            rows = slice(band << N_FLAGS, (band + 1) << N_FLAGS)
+            for r_idx, r in enumerate(self.rules):
+                if band not in r.bands:
+                    continue
+                match = (masks & r.all_flags) == r.all_flags
+                if r.any_flags:
+                    match &= (masks & r.any_flags) != 0
+                match &= (masks & r.none_flags) == 0
+                matrix[rows, r_idx] = match
+        return matrix
+
+    @staticmethod
+    def signature(band, flags):
+        return (np.asarray(band, dtype=np.int32) << N_FLAGS) | np.asarray(flags, dtype=np.int32)
+
+    def _build_plan(self, signature):
+        band, flags = signature >> N_FLAGS, signature & ((1 << N_FLAGS) - 1)
+        matched = np.flatnonzero(self._rule_matrix[signature])
+        rationale = RATIONALE[band]
+        if band == BAND_LOW and flags:
+            rationale = "Risk is low, but: " + " ".join(
+                reason for mask, reason in FLAG_REASONS if flags & mask
+            )
+        return {
+            'band': BAND_NAMES[band],
+            'steps': tuple(self.rules[i].step for i in matched),
+            'actions': tuple(self.rules[i].text for i in matched),
+            'rationale': rationale,
+        }
+
+    def recommend(self, risk_percent, vitals, scores=None):
+        """Recommendations for one patient-hour from the dashboard vitals dict"""
+        scores = scores if scores is not None else {}
+        flags = signature_flags(
+            vitals.get('HR', np.nan), vitals.get('SBP', np.nan), vitals.get('DBP', np.nan),
+            vitals.get('SpO2', np.nan), vitals.get('Temp', np.nan), vitals.get('RR', np.nan),
+            vitals.get('Lactate', np.nan),
+            scores.get('SIRS', 0), scores.get('qSOFA', 0), scores.get('NEWS2_band', 0),
+        )
+        sig = int(self.signature(risk_bands(risk_percent), flags)[0])
+        return self.plan(sig)
+
+    def signatures(self, risk_percent, frame):
+        """Signatures for many patient-hours; ``frame`` uses the raw dataset column names"""
+        def col(name, default=np.nan):
+            return frame[name].to_numpy(dtype=float, na_value=np.nan) if name in frame.columns else default
+
+        flags = signature_flags(
+            col('HR'), col('SBP'), col('DBP'), col('O2Sat'), col('Temp'), col('Resp'),
+            col('Lactate'), col('SIRS', 0), col('qSOFA', 0), col('NEWS2_band', 0),
+        )
+        if len(flags) == 1 and len(frame) != 1:
+            flags = np.broadcast_to(flags, len(frame))
+        return self.signature(risk_bands(risk_percent), flags)
+
+    def recommend_batch(self, risk_percent, frame):
+        """Plans for many patient-hours, rendered once per distinct signature"""
+        sigs = self.signatures(risk_percent, frame)
+        unique, inverse = np.unique(sigs, return_inverse=True)
+        plans = [self.plan(int(s)) for s in unique]
+        return [plans[i] for i in inverse]
+
+    def needs(self, step, risk_percent, frame):
+        """Boolean mask of rows whose plan contains ``step`` (e.g. 'antibiotics_1h')"""
+        return self._step_matrix[self.signatures(risk_percent, frame), self._step_col[step]]
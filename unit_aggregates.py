@@ -0,0 +1,283 @@
+"""
+UNIT-LEVEL AGGREGATES
+Incrementally maintained hour/shift/day rollups of risk bands, abnormal
+vitals and alerts, so unit dashboards never touch the raw history
+
+    python unit_aggregates.py backfill --data data/processed/sepsis_features_final.parquet \\
+                                       --model models/xgboost_sepsis.pkl --store cache/unit.sqlite
+
+Run ``update`` after every append to the time-series store (e.g. from cron)
+to score and record the new patient-hours.
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from backtest import alert_hours, policy, prepare_cohort
+from cohort_scoring import load_scored_cohort, score_cohort
+from time_series_store import add_store_arguments, store_from_args
+from treatment_rules import VITAL_FLAGS, risk_bands, signature_flags
+
+# Resolution name -> hours per bucket
+RESOLUTIONS = {'hour': 1, 'shift': 8, 'day': 24}
+RISK_HIST_BINS = 10
+DEFAULT_ALERT_POLICY = policy(60, name="dashboard DANGER (>=60%)")
+
+_HIST_COLS = [f"h{i}" for i in range(RISK_HIST_BINS)]
+_SUM_COLS = ['n', 'band_low', 'band_medium', 'band_high', 'abnormal_vitals', 'alerts',
+             'risk_sum', 'tta_sum', 'tta_n'] + _HIST_COLS
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scored (
+    patient_id INTEGER NOT NULL,
+    hour       INTEGER NOT NULL,
+    risk       REAL,
+    PRIMARY KEY (patient_id, hour)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS first_alert (
+    patient_id INTEGER PRIMARY KEY,
+    unit_hour  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution TEXT    NOT NULL,
+    bucket     INTEGER NOT NULL,
+    {', '.join(f'{c} REAL NOT NULL DEFAULT 0' for c in _SUM_COLS)},
+    PRIMARY KEY (resolution, bucket)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = (
+    f"INSERT INTO rollups (resolution, bucket, {', '.join(_SUM_COLS)}) "
+    f"VALUES (?, ?, {', '.join('?' for _ in _SUM_COLS)}) "
+    f"ON CONFLICT (resolution, bucket) DO UPDATE SET "
+    + ", ".join(f"{c} = {c} + excluded.{c}" for c in _SUM_COLS)
+)
+
+
+def current_unit_hour():
+    """Wall-clock hours since the epoch, the store's time axis"""
+    return int(time.time() // 3600)
+
+
+def abnormal_vital_counts(frame):
+    """Number of abnormal vitals per row (dashboard thresholds), from raw dataset columns"""
+    def col(name):
+        return frame[name].to_numpy(dtype=float, na_value=np.nan) if name in frame.columns else np.nan
+
+    flags = signature_flags(col('HR'), col('SBP'), col('DBP'), col('O2Sat'), col('Temp'), col('Resp'))
+    flags = np.broadcast_to(flags & VITAL_FLAGS, len(frame))
+    return np.array([bin(int(f)).count('1') for f in range(VITAL_FLAGS + 1)])[flags]
+
+
+class UnitAggregateStore:
+    """SQLite rollups keyed by (resolution, bucket) with additive counters.
+
+    Each (patient, hour) is counted once no matter how often it is recorded,
+    and reads only touch the handful of buckets in the requested window.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        # Stores created before risks were kept alongside the recorded keys
+        if 'risk' not in [row[1] for row in conn.execute("PRAGMA table_info(scored)")]:
+            conn.execute("ALTER TABLE scored ADD COLUMN risk REAL")
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    # --------------------------------------------------------
+    # Writes
+    # --------------------------------------------------------
+    def record(self, patient_id, hour, unit_hour, risk, abnormal_vitals, alert):
+        return self.record_many(pd.DataFrame({
+            'patient_id': [patient_id], 'hour': [hour], 'unit_hour': [unit_hour],
+            'risk': [risk], 'abnormal_vitals': [abnormal_vitals], 'alert': [alert],
+        }))
+
+    def record_many(self, rows):
+        """Fold new scores into every rollup in one transaction.
+
+        ``rows`` has patient_id, hour (hours since admission), unit_hour,
+        risk (%), abnormal_vitals (count) and alert (bool) columns.
+        """
+        rows = rows.reset_index(drop=True)
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            keys = zip(rows['patient_id'].astype(int), rows['hour'].astype(int), rows['risk'].astype(float))
+            is_new = np.array([
+                conn.execute("INSERT OR IGNORE INTO scored VALUES (?, ?, ?)", key).rowcount == 1
+                for key in keys
+            ], dtype=bool)
+            fresh = rows.loc[is_new]
+            if len(fresh):
+                self._fold(conn, fresh)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return int(is_new.sum())
+
+    def _fold(self, conn, rows):
+        risk = rows['risk'].to_numpy(dtype=float)
+        bands = risk_bands(risk)
+        frame = pd.DataFrame({
+            'unit_hour': rows['unit_hour'].to_numpy(dtype=np.int64),
+            'n': 1.0,
+            'band_low': bands == 0,
+            'band_medium': bands == 1,
+            'band_high': bands == 2,
+            'abnormal_vitals': rows['abnormal_vitals'].to_numpy(dtype=float),
+            'alerts': rows['alert'].to_numpy(dtype=bool),
+            'risk_sum': risk,
+            'tta_sum': 0.0,
+            'tta_n': 0.0,
+        }, index=rows.index)
+        hist_bin = np.clip((risk // (100 / RISK_HIST_BINS)).astype(int), 0, RISK_HIST_BINS - 1)
+        for i, col in enumerate(_HIST_COLS):
+            frame[col] = hist_bin == i
+
+        # Time to first alert, credited to the bucket in which the alert fired
+        alerted = rows.loc[rows['alert'].to_numpy(dtype=bool)].sort_values('unit_hour')
+        alerted = alerted[['patient_id', 'hour', 'unit_hour']].astype(int)
+        for pos, patient_id, hour, unit_hour in alerted.itertuples(name=None):
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO first_alert VALUES (?, ?)", (patient_id, unit_hour)
+            ).rowcount
+            if inserted:
+                frame.loc[pos, 'tta_sum'] += hour
+                frame.loc[pos, 'tta_n'] += 1
+
+        for resolution, width in RESOLUTIONS.items():
+            sums = frame.groupby(frame['unit_hour'] // width)[_SUM_COLS].sum()
+            conn.executemany(_UPSERT, [
+                (resolution, int(bucket), *map(float, values))
+                for bucket, values in zip(sums.index, sums.to_numpy())
+            ])
+
+    # --------------------------------------------------------
+    # Reads
+    # --------------------------------------------------------
+    def series(self, resolution, last_n, end_unit_hour=None):
+        """The last ``last_n`` buckets at a resolution (empty buckets included)"""
+        width = RESOLUTIONS[resolution]
+        end_bucket = (end_unit_hour if end_unit_hour is not None else current_unit_hour()) // width
+        start_bucket = end_bucket - last_n + 1
+        rows = self._conn().execute(
+            f"SELECT bucket, {', '.join(_SUM_COLS)} FROM rollups "
+            "WHERE resolution = ? AND bucket BETWEEN ? AND ?",
+            (resolution, start_bucket, end_bucket),
+        ).fetchall()
+        frame = pd.DataFrame(rows, columns=['bucket'] + _SUM_COLS).set_index('bucket')
+        frame = frame.reindex(range(start_bucket, end_bucket + 1), fill_value=0.0)
+        frame['start'] = pd.to_datetime(frame.index * width * 3600, unit='s')
+        frame['mean_risk'] = frame['risk_sum'] / frame['n'].where(frame['n'] > 0)
+        frame['mean_time_to_alert_h'] = frame['tta_sum'] / frame['tta_n'].where(frame['tta_n'] > 0)
+        return frame
+
+    def recorded(self):
+        """patient_id, hour and risk of every patient-hour already folded in"""
+        rows = self._conn().execute("SELECT patient_id, hour, risk FROM scored").fetchall()
+        return pd.DataFrame(rows, columns=['patient_id', 'hour', 'risk']).astype({'risk': float})
+
+    def latest_unit_hour(self):
+        row = self._conn().execute(
+            "SELECT MAX(bucket) FROM rollups WHERE resolution = 'hour'"
+        ).fetchone()
+        return row[0]
+
+
+def backfill(store, scored, end_unit_hour=None, alert_policy=DEFAULT_ALERT_POLICY):
+    """Load a scored cohort into the store, aligning every stay to end at ``end_unit_hour``"""
+    end_unit_hour = end_unit_hour if end_unit_hour is not None else current_unit_hour()
+    hours = scored['Hour'].to_numpy(dtype=np.int64)
+    last_hour = scored.groupby('Patient_ID')['Hour'].transform('max').to_numpy(dtype=np.int64)
+    rows = pd.DataFrame({
+        'patient_id': scored['Patient_ID'].to_numpy(),
+        'hour': hours,
+        'unit_hour': end_unit_hour - last_hour + hours,
+        'risk': scored['risk'].to_numpy(dtype=float),
+        'abnormal_vitals': abnormal_vital_counts(scored),
+        'alert': alert_hours(prepare_cohort(scored), alert_policy),
+    })
+    return store.record_many(rows)
+
+
+def update(store, data, model, end_unit_hour=None, alert_policy=DEFAULT_ALERT_POLICY):
+    """Score and record only the patient-hours in ``data`` that the store has not seen.
+
+    Stays are aligned to end at ``end_unit_hour`` as in ``backfill``; risks
+    of hours recorded earlier come from the store, so alerts that depend on
+    the previous hours need no rescoring.
+    """
+    if alert_policy.min_news2:
+        raise ValueError("update only supports risk-based alert policies (min_news2=0)")
+    end_unit_hour = end_unit_hour if end_unit_hour is not None else current_unit_hour()
+    recorded = store.recorded().rename(columns={'patient_id': 'Patient_ID', 'hour': 'Hour'})
+    keys = data[['Patient_ID', 'Hour']].astype(np.int64)
+    seen = pd.MultiIndex.from_frame(recorded[['Patient_ID', 'Hour']].astype(np.int64))
+    new = data.loc[~pd.MultiIndex.from_frame(keys).isin(seen)]
+    if not len(new):
+        return 0
+
+    new = new.assign(risk=score_cohort(model, new)).sort_values(['Patient_ID', 'Hour'], kind='stable')
+    context = recorded[recorded['Patient_ID'].isin(new['Patient_ID'].unique())]
+    stays = pd.concat([context, new[['Patient_ID', 'Hour', 'risk']]], ignore_index=True)
+    stays['is_new'] = np.r_[np.zeros(len(context), bool), np.ones(len(new), bool)]
+    stays = stays.astype({'Patient_ID': np.int64, 'Hour': np.int64})
+    stays = stays.sort_values(['Patient_ID', 'Hour'], kind='stable').reset_index(drop=True)
+    stays['alert'] = alert_hours(prepare_cohort(stays), alert_policy)
+    stays['last_hour'] = stays.groupby('Patient_ID')['Hour'].transform('max')
+    stays = stays[stays['is_new'].to_numpy()]
+
+    hours = stays['Hour'].to_numpy(dtype=np.int64)
+    return store.record_many(pd.DataFrame({
+        'patient_id': stays['Patient_ID'].to_numpy(),
+        'hour': hours,
+        'unit_hour': end_unit_hour - stays['last_hour'].to_numpy(dtype=np.int64) + hours,
+        'risk': stays['risk'].to_numpy(dtype=float),
+        'abnormal_vitals': abnormal_vital_counts(new),
+        'alert': stays['alert'].to_numpy(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain unit-level aggregate rollups")
+    sub = parser.add_subparsers(dest='command', required=True)
+    fill = sub.add_parser('backfill', help="Load the scored cohort into the store")
+    add_store_arguments(fill)
+    fill.add_argument('--model', required=True)
+    fill.add_argument('--store', required=True, help="SQLite file for the rollups")
+    fill.add_argument('--cache-dir', default=None, help="Reuse/store the scored cohort here")
+    upd = sub.add_parser('update', help="Score and record patient-hours appended since the last run")
+    add_store_arguments(upd)
+    upd.add_argument('--model', required=True)
+    upd.add_argument('--store', required=True, help="SQLite file for the rollups")
+    args = parser.parse_args()
+
+    if args.command == 'update':
+        added = update(UnitAggregateStore(args.store), store_from_args(args).read(), joblib.load(args.model))
+    else:
+        scored = load_scored_cohort(store_from_args(args), args.model, args.cache_dir)
+        added = backfill(UnitAggregateStore(args.store), scored)
+    print(f"Recorded {added} new patient-hours into {args.store}")
+
+if __name__ == '__main__':
+    main()